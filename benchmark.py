@@ -0,0 +1,266 @@
+"""A performance benchmark suite for the tessellation pipeline.
+
+Each benchmark is timed over a number of repetitions, then run once more under
+tracemalloc to measure peak memory (tracemalloc slows execution down, so the
+two measurements are kept separate). Results are emitted as JSON so that runs
+can be saved and compared:
+
+    python benchmark.py --output before.json
+    # ... make a change ...
+    python benchmark.py --output after.json --compare before.json
+"""
+
+from collections import namedtuple
+from geometry import Circle
+from geometry import Point
+from geometry import circle_through_points_perpendicular_to_circle
+from hyperbolic import compute_fundamental_triangle
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from tessellation_graph import TessellationGraph
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+
+CONFIGURATIONS = [(7, 3), (4, 5), (6, 4), (3, 7)]
+# TessellationGraph's layer construction does not support q = 3.
+GRAPH_CONFIGURATIONS = [(p, q) for (p, q) in CONFIGURATIONS if q > 3]
+TESSELLATE_COUNTS = [100, 500, 2000]
+RENDER_COUNTS = [500]
+GRAPH_LAYERS = [2, 3, 4, 5]
+PRIMITIVE_CALLS = 10000
+
+
+class Benchmark(namedtuple('Benchmark', ['name', 'setup', 'run', 'unit'])):
+    """A named operation to time.
+
+    setup() is called before each repetition and is not timed. Its result is
+    passed to run(), which returns the number of items (polygons, vertices, or
+    calls) processed, used to compute throughput.
+    """
+
+
+def no_setup():
+    return None
+
+
+def fundamental_triangle_benchmarks(configurations, calls):
+    def make_run(config):
+        def run(_):
+            for i in range(calls):
+                compute_fundamental_triangle(config)
+            return calls
+        return run
+
+    return [
+        Benchmark('compute_fundamental_triangle/{}_{}'.format(p, q), no_setup,
+                  make_run(TessellationConfiguration(p, q)), 'calls')
+        for p, q in configurations
+    ]
+
+
+def center_polygon_benchmarks(configurations):
+    def make_setup(config):
+        def setup():
+            return HyperbolicTessellation(config, max_polygon_count=0)
+        return setup
+
+    def run(tessellation):
+        tessellation.compute_center_polygon()
+        return 1
+
+    return [
+        Benchmark('compute_center_polygon/{}_{}'.format(p, q),
+                  make_setup(TessellationConfiguration(p, q)), run, 'polygons')
+        for p, q in configurations
+    ]
+
+
+def tessellate_benchmarks(configurations, counts):
+    def make_setup(config):
+        def setup():
+            return HyperbolicTessellation(config, max_polygon_count=0)
+        return setup
+
+    def make_run(count):
+        def run(tessellation):
+            return len(tessellation.tessellate(max_polygon_count=count))
+        return run
+
+    return [
+        Benchmark('tessellate/{}_{}/{}'.format(p, q, count),
+                  make_setup(TessellationConfiguration(p, q)), make_run(count), 'polygons')
+        for p, q in configurations
+        for count in counts
+    ]
+
+
+def render_benchmarks(configurations, counts, canvas_width=500):
+    def make_setup(config, count):
+        def setup():
+            return HyperbolicTessellation(config, max_polygon_count=count)
+        return setup
+
+    def run(tessellation):
+        drawing = tessellation.render_drawing(canvas_width)
+        drawing.write(io.StringIO())
+        return len(tessellation.tessellated_polygons)
+
+    return [
+        Benchmark('render/{}_{}/{}'.format(p, q, count),
+                  make_setup(TessellationConfiguration(p, q), count), run, 'polygons')
+        for p, q in configurations
+        for count in counts
+    ]
+
+
+def graph_benchmarks(configurations, layer_counts):
+    def make_run(config, num_layers):
+        def run(_):
+            graph = TessellationGraph(config, num_layers=num_layers)
+            return len(graph.vertices)
+        return run
+
+    return [
+        Benchmark('tessellation_graph/{}_{}/{}'.format(p, q, num_layers), no_setup,
+                  make_run(TessellationConfiguration(p, q), num_layers), 'polygons')
+        for p, q in configurations
+        for num_layers in layer_counts
+    ]
+
+
+def primitive_benchmarks(calls):
+    unit_circle = Circle(Point(0, 0), 1)
+    points = [
+        Point(0.5 * math.cos(2 * math.pi * i / calls), 0.5 * math.sin(2 * math.pi * i / calls))
+        for i in range(calls)
+    ]
+    pairs = list(zip(points, points[1:] + points[:1]))
+    inversion_circle = Circle(Point(1.5, 0), (5 / 4) ** 0.5)
+
+    def run_circle_through_points(_):
+        for p1, p2 in pairs:
+            circle_through_points_perpendicular_to_circle(p1, p2, unit_circle)
+        return len(pairs)
+
+    def run_invert_point(_):
+        for point in points:
+            inversion_circle.invert_point(point)
+        return len(points)
+
+    return [
+        Benchmark('circle_through_points_perpendicular_to_circle', no_setup,
+                  run_circle_through_points, 'calls'),
+        Benchmark('invert_point', no_setup, run_invert_point, 'calls'),
+    ]
+
+
+def default_benchmarks(quick=False):
+    """The full suite, or a much smaller version of it when quick is set."""
+    configurations = CONFIGURATIONS
+    tessellate_counts = [50] if quick else TESSELLATE_COUNTS
+    render_counts = [50] if quick else RENDER_COUNTS
+    graph_layers = [2, 3] if quick else GRAPH_LAYERS
+    calls = 100 if quick else PRIMITIVE_CALLS
+
+    return (
+        fundamental_triangle_benchmarks(configurations, calls)
+        + center_polygon_benchmarks(configurations)
+        + tessellate_benchmarks(configurations, tessellate_counts)
+        + render_benchmarks(configurations, render_counts)
+        + graph_benchmarks(GRAPH_CONFIGURATIONS, graph_layers)
+        + primitive_benchmarks(calls)
+    )
+
+
+def measure(benchmark, repeat=3):
+    """Run a benchmark and return a JSON-serializable result record."""
+    times = []
+    items = 0
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(repeat):
+            state = benchmark.setup()
+            start = time.perf_counter()
+            items = benchmark.run(state)
+            times.append(time.perf_counter() - start)
+
+        state = benchmark.setup()
+        tracemalloc.start()
+        try:
+            benchmark.run(state)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'name': benchmark.name,
+        'repeat': repeat,
+        'best_seconds': best,
+        'mean_seconds': sum(times) / len(times),
+        'peak_memory_bytes': peak_bytes,
+        'items': items,
+        'unit': benchmark.unit,
+        'items_per_second': items / best if best > 0 else None,
+    }
+
+
+def run_benchmarks(benchmarks, repeat=3, name_filter=None):
+    return [
+        measure(benchmark, repeat=repeat)
+        for benchmark in benchmarks
+        if name_filter is None or name_filter in benchmark.name
+    ]
+
+
+def compare(baseline, current):
+    """Return a dict mapping each benchmark name present in both runs to the
+    speedup of current over baseline (> 1 means current is faster).
+    """
+    baseline_times = {r['name']: r['best_seconds'] for r in baseline}
+    return {
+        r['name']: baseline_times[r['name']] / r['best_seconds']
+        for r in current
+        if r['name'] in baseline_times and r['best_seconds'] > 0
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the tessellation pipeline.")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default=None,
+                        help="only run benchmarks whose name contains this string")
+    parser.add_argument('--quick', action='store_true', help="run a reduced suite")
+    parser.add_argument('--output', default=None, help="write results here instead of stdout")
+    parser.add_argument('--compare', default=None,
+                        help="a previous results file to compute speedups against")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmarks(
+        default_benchmarks(quick=args.quick), repeat=args.repeat, name_filter=args.filter)
+    output = {'results': results}
+
+    if args.compare:
+        with open(args.compare) as f:
+            output['speedups'] = compare(json.load(f)['results'], results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import json
+
+from benchmark import *
+
+
+def test_quick_suite_covers_all_operations():
+    names = [b.name for b in default_benchmarks(quick=True)]
+    for prefix in ['compute_fundamental_triangle/', 'compute_center_polygon/',
+                   'tessellate/7_3/', 'tessellate/3_7/', 'render/',
+                   'tessellation_graph/', 'invert_point',
+                   'circle_through_points_perpendicular_to_circle']:
+        assert any(name.startswith(prefix) for name in names)
+
+
+def test_measure_reports_time_memory_and_throughput():
+    benchmark = tessellate_benchmarks([(6, 4)], [20])[0]
+    result = measure(benchmark, repeat=2)
+    assert result['name'] == 'tessellate/6_4/20'
+    assert result['items'] == 21
+    assert result['unit'] == 'polygons'
+    assert result['peak_memory_bytes'] > 0
+    assert result['items_per_second'] > 0
+    json.dumps(result)
+
+
+def test_render_benchmark_writes_to_memory():
+    benchmark = render_benchmarks([(4, 5)], [10])[0]
+    assert measure(benchmark, repeat=1)['items'] == 11
+
+
+def test_compare():
+    baseline = [{'name': 'a', 'best_seconds': 2.0}, {'name': 'b', 'best_seconds': 1.0}]
+    current = [{'name': 'a', 'best_seconds': 1.0}, {'name': 'c', 'best_seconds': 1.0}]
+    assert compare(baseline, current) == {'a': 2.0}
@@ -0,0 +1,124 @@
+"""A simple binary container for named flat arrays, readable through mmap.
+
+The file layout is
+
+    magic (8 bytes)
+    header length (8 bytes, little endian)
+    header (JSON, utf-8)
+    array data, each array starting at a multiple of 8 bytes
+
+The header holds caller metadata, the byte order of the machine that wrote
+the file, and the typecode, offset and length of each array. Reading maps the
+file and returns each array as a memoryview cast to its typecode, so opening
+a file is O(1) and the data is only paged in as it is accessed.
+"""
+
+from collections import namedtuple
+import json
+import mmap
+import struct
+import sys
+
+
+ALIGNMENT = 8
+
+
+class MappedArrays(namedtuple('MappedArrays', ['metadata', 'arrays', 'mapping'])):
+    """The result of read_arrays: the caller's metadata, a dict of
+    memoryviews keyed by array name, and the underlying mmap.
+    """
+
+    def close(self):
+        """Release the arrays and unmap the file. The arrays can't be used
+        afterwards. Closing again does nothing.
+
+        Slices taken from the arrays keep the file mapped: they stay valid,
+        and the file is unmapped once the last of them is garbage collected.
+        """
+        for view in self.arrays.values():
+            view.release()
+        try:
+            self.mapping.close()
+        except BufferError:
+            # Slices of the arrays still hold buffers exported by the
+            # mapping, which closes it when they are released.
+            pass
+
+
+def _padding(length):
+    return -length % ALIGNMENT
+
+
+def write_arrays(path, magic, metadata, arrays):
+    """Write metadata (a JSON-serializable dict) and a list of (name, array)
+    pairs to path, where each array is an array.array or a one-dimensional
+    memoryview. magic identifies the file type and must be 8 bytes.
+    """
+    if len(magic) != 8:
+        raise ValueError("magic must be 8 bytes, not {!r}".format(magic))
+
+    layout = []
+    offset = 0
+    for name, values in arrays:
+        size = len(values) * values.itemsize
+        layout.append({
+            'name': name,
+            # Arrays read back by read_arrays are memoryviews, which have a
+            # format instead of a typecode.
+            'typecode': getattr(values, 'typecode', None) or values.format,
+            'offset': offset,
+            'length': len(values),
+        })
+        offset += size + _padding(size)
+
+    header = json.dumps({
+        'metadata': metadata,
+        'byteorder': sys.byteorder,
+        'arrays': layout,
+    }).encode('utf-8')
+    header += b' ' * _padding(len(magic) + 8 + len(header))
+
+    with open(path, 'wb') as f:
+        f.write(magic)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for _, values in arrays:
+            data = values.tobytes()
+            f.write(data)
+            f.write(b'\0' * _padding(len(data)))
+
+
+def read_arrays(path, magic):
+    """Map a file written by write_arrays and return its MappedArrays.
+
+    Raise a ValueError if the file does not start with magic, or was written
+    on a machine with a different byte order.
+    """
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays = {}
+    try:
+        if mapping[:8] != magic:
+            raise ValueError("{} is not a {!r} file".format(path, magic))
+        header_length, = struct.unpack('<Q', mapping[8:16])
+        header = json.loads(mapping[16:16 + header_length].decode('utf-8'))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError("{} was written with {} endian byte order".format(
+                path, header['byteorder']))
+
+        data_start = 16 + header_length
+        buffer = memoryview(mapping)
+        for entry in header['arrays']:
+            start = data_start + entry['offset']
+            itemsize = struct.calcsize(entry['typecode'])
+            arrays[entry['name']] = buffer[start:start + entry['length'] * itemsize].cast(
+                entry['typecode'])
+        buffer.release()
+    except Exception:
+        for view in arrays.values():
+            view.release()
+        mapping.close()
+        raise
+
+    return MappedArrays(header['metadata'], arrays, mapping)
@@ -0,0 +1,50 @@
+from array import array
+import pytest
+
+from binary_io import *
+
+
+def test_round_trip(tmpdir):
+    path = str(tmpdir.join('arrays.bin'))
+    arrays = [
+        ('doubles', array('d', [1.5, -2.25, 3.0])),
+        ('bytes', array('b', [1, -1, 0])),
+        ('empty', array('q')),
+        ('longs', array('q', [2 ** 40, 7])),
+    ]
+    write_arrays(path, b'TESTFILE', {'name': 'test', 'count': 3}, arrays)
+
+    mapped = read_arrays(path, b'TESTFILE')
+    assert mapped.metadata == {'name': 'test', 'count': 3}
+    for name, values in arrays:
+        assert mapped.arrays[name].format == values.typecode
+        assert list(mapped.arrays[name]) == list(values)
+
+    # Memoryviews can be written back out.
+    copy_path = str(tmpdir.join('copy.bin'))
+    write_arrays(copy_path, b'TESTFILE', mapped.metadata, list(mapped.arrays.items()))
+    mapped.close()
+    with open(path, 'rb') as f1, open(copy_path, 'rb') as f2:
+        assert f1.read() == f2.read()
+
+
+def test_wrong_magic(tmpdir):
+    path = str(tmpdir.join('arrays.bin'))
+    write_arrays(path, b'TESTFILE', {}, [])
+    with pytest.raises(ValueError):
+        read_arrays(path, b'OTHERFIL')
+    with pytest.raises(ValueError):
+        write_arrays(path, b'SHORT', {}, [])
+
+
+def test_close_with_live_slices(tmpdir):
+    path = str(tmpdir.join('arrays.bin'))
+    write_arrays(path, b'TESTFILE', {}, [('longs', array('q', [1, 2, 3, 4]))])
+    mapped = read_arrays(path, b'TESTFILE')
+    held = mapped.arrays['longs'][1:3]
+
+    mapped.close()
+    mapped.close()
+    assert list(held) == [2, 3]
+    with pytest.raises(ValueError):
+        mapped.arrays['longs'][0]
@@ -0,0 +1,227 @@
+"""A command line entry point for generating a catalogue of {p, q}
+tessellations in parallel.
+
+Each (p, q, count) combination is a job run in a worker process. Jobs whose
+output file already exists are skipped, and a JSON summary with per-job timing
+and memory usage is written at the end.
+
+Example:
+
+    python catalogue.py --p 3 8 --q 3 8 --counts 500 2000 --jobs 4
+"""
+
+from collections import namedtuple
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+
+OUTPUT_FORMATS = ['svg', 'json']
+
+
+class CatalogueJob(
+        namedtuple('CatalogueJob',
+                   ['p', 'q', 'max_polygon_count', 'min_polygon_area',
+                    'output_format', 'canvas_width', 'path'])):
+    """The parameters of a single tessellation to generate and write to
+    path.
+    """
+
+
+def output_filename(p, q, output_format, max_polygon_count=None):
+    """The filename of a catalogue entry. The polygon count is only part of
+    the name when the catalogue contains more than one count per
+    configuration.
+    """
+    if max_polygon_count is None:
+        return "tessellation_{}_{}.{}".format(p, q, output_format)
+    return "tessellation_{}_{}_{}.{}".format(p, q, max_polygon_count, output_format)
+
+
+def hyperbolic_configurations(p_values, q_values):
+    return [
+        (p, q) for p in p_values for q in q_values
+        if (p - 2) * (q - 2) > 4
+    ]
+
+
+def plan_jobs(p_values, q_values, counts, output_formats, output_dir,
+              canvas_width=500, min_polygon_area=None):
+    """Return the list of jobs in the catalogue, in a deterministic order."""
+    include_count = len(counts) > 1
+    jobs = []
+    for p, q in hyperbolic_configurations(p_values, q_values):
+        for count in counts:
+            for output_format in output_formats:
+                filename = output_filename(
+                    p, q, output_format, count if include_count else None)
+                jobs.append(CatalogueJob(
+                    p=p,
+                    q=q,
+                    max_polygon_count=count,
+                    min_polygon_area=min_polygon_area,
+                    output_format=output_format,
+                    canvas_width=canvas_width,
+                    path=os.path.join(output_dir, filename)))
+    return jobs
+
+
+def write_polygons_json(tessellation, path):
+    with open(path, 'w') as f:
+        json.dump({
+            'p': tessellation.configuration.numPolygonSides,
+            'q': tessellation.configuration.numPolygonsPerVertex,
+            'polygons': [
+                [[point.x, point.y] for point in polygon]
+                for polygon in tessellation.tessellated_polygons
+            ],
+        }, f)
+
+
+def _max_rss_kb():
+    """The peak resident set size of this process, or None on platforms
+    without the resource module.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_job(job):
+    """Build and write the tessellation for a job, returning a summary
+    record. Exceptions are caught and reported in the record so that one bad
+    configuration does not abort the whole catalogue.
+
+    The output is written to a temporary file next to job.path and moved
+    into place once complete, so an interrupted job never leaves a partial
+    file that later runs would skip.
+    """
+    record = dict(job._asdict())
+    temporary_path = job.path + '.tmp'
+    start = time.perf_counter()
+    try:
+        config = TessellationConfiguration(job.p, job.q)
+        tessellation = HyperbolicTessellation(
+            config,
+            max_polygon_count=job.max_polygon_count,
+            min_polygon_area=job.min_polygon_area)
+        tessellated = time.perf_counter()
+
+        if job.output_format == 'svg':
+            tessellation.render(filename=temporary_path, canvas_width=job.canvas_width)
+        elif job.output_format == 'json':
+            write_polygons_json(tessellation, temporary_path)
+        else:
+            raise ValueError("Unknown output format {}".format(job.output_format))
+        os.replace(temporary_path, job.path)
+        finished = time.perf_counter()
+
+        record.update(
+            status='ok',
+            polygon_count=len(tessellation.tessellated_polygons),
+            tessellate_seconds=tessellated - start,
+            write_seconds=finished - tessellated)
+    except Exception as e:
+        finished = time.perf_counter()
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        record.update(status='failed', error=repr(e))
+
+    record['seconds'] = finished - start
+    # Pool workers are spawned fresh and run one job each, so this is the
+    # peak of this job (plus the interpreter and imports). A forked worker
+    # would instead inherit the parent's high-water mark.
+    record['max_rss_kb'] = _max_rss_kb()
+    return record
+
+
+def run_catalogue(jobs, num_processes=None, overwrite=False):
+    """Run all jobs whose output does not already exist, and return the list
+    of summary records in the order of jobs, including one for each skipped
+    job.
+    """
+    records = [None] * len(jobs)
+    pending = []
+    for index, job in enumerate(jobs):
+        if not overwrite and os.path.exists(job.path):
+            record = dict(job._asdict())
+            record['status'] = 'skipped'
+            records[index] = record
+        else:
+            pending.append(index)
+
+    for directory in set(os.path.dirname(jobs[index].path) for index in pending):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    if pending:
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(processes=num_processes, maxtasksperchild=1) as pool:
+            completed = pool.map(run_job, [jobs[index] for index in pending], chunksize=1)
+        for index, record in zip(pending, completed):
+            records[index] = record
+
+    return records
+
+
+def parse_range(values):
+    """Parse a [start, stop) pair of integers into a range."""
+    start, stop = values
+    return range(start, stop)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Generate a catalogue of {p, q} hyperbolic tessellations.")
+    parser.add_argument('--p', nargs=2, type=int, default=[3, 8], metavar=('START', 'STOP'),
+                        help="half-open range of polygon side counts")
+    parser.add_argument('--q', nargs=2, type=int, default=[3, 8], metavar=('START', 'STOP'),
+                        help="half-open range of polygons per vertex")
+    parser.add_argument('--counts', nargs='+', type=int, default=[500],
+                        help="max polygon counts to generate for each configuration")
+    parser.add_argument('--min-polygon-area', type=float, default=None,
+                        help="stop expanding polygons whose bounding box area is below this")
+    parser.add_argument('--formats', nargs='+', choices=OUTPUT_FORMATS, default=['svg'])
+    parser.add_argument('--canvas-width', type=int, default=500)
+    parser.add_argument('--output-dir', default='svg')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="regenerate configurations that already exist")
+    parser.add_argument('--summary', default=None,
+                        help="write the JSON summary here instead of stdout")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    jobs = plan_jobs(
+        p_values=parse_range(args.p),
+        q_values=parse_range(args.q),
+        counts=args.counts,
+        output_formats=args.formats,
+        output_dir=args.output_dir,
+        canvas_width=args.canvas_width,
+        min_polygon_area=args.min_polygon_area)
+    records = run_catalogue(jobs, num_processes=args.jobs, overwrite=args.overwrite)
+
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(records, f, indent=2)
+    else:
+        json.dump(records, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    return 0 if all(r['status'] != 'failed' for r in records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
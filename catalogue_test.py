@@ -0,0 +1,68 @@
+import json
+import os
+
+from catalogue import *
+
+
+def test_plan_jobs_skips_non_hyperbolic_configurations():
+    jobs = plan_jobs(range(3, 5), range(3, 6), counts=[10], output_formats=['svg'],
+                     output_dir='out')
+    assert [(job.p, job.q) for job in jobs] == [(4, 5)]
+    assert jobs[0].path == os.path.join('out', 'tessellation_4_5.svg')
+
+
+def test_plan_jobs_includes_count_in_filename_for_multiple_counts():
+    jobs = plan_jobs([6], [4], counts=[10, 20], output_formats=['json'], output_dir='out')
+    assert [job.path for job in jobs] == [
+        os.path.join('out', 'tessellation_6_4_10.json'),
+        os.path.join('out', 'tessellation_6_4_20.json'),
+    ]
+
+
+def test_run_job_writes_json(tmpdir):
+    path = str(tmpdir.join('tessellation_6_4.json'))
+    job = CatalogueJob(p=6, q=4, max_polygon_count=10, min_polygon_area=None,
+                       output_format='json', canvas_width=100, path=path)
+    record = run_job(job)
+    assert record['status'] == 'ok'
+    assert record['polygon_count'] == 11
+    assert record['seconds'] >= 0
+    assert record['max_rss_kb'] > 0
+    with open(path) as f:
+        assert len(json.load(f)['polygons']) == 11
+    assert os.listdir(str(tmpdir)) == ['tessellation_6_4.json']
+
+
+def test_run_job_failure_leaves_no_output(tmpdir, monkeypatch):
+    def fail_after_partial_write(tessellation, path):
+        with open(path, 'w') as f:
+            f.write('{"p": 6')
+        raise IOError("disk full")
+
+    monkeypatch.setattr('catalogue.write_polygons_json', fail_after_partial_write)
+    path = str(tmpdir.join('tessellation_6_4.json'))
+    job = CatalogueJob(p=6, q=4, max_polygon_count=10, min_polygon_area=None,
+                       output_format='json', canvas_width=100, path=path)
+    record = run_job(job)
+    assert record['status'] == 'failed'
+    assert 'disk full' in record['error']
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_run_catalogue_skips_existing_outputs(tmpdir):
+    output_dir = str(tmpdir)
+    jobs = plan_jobs([6], [4, 5], counts=[5], output_formats=['svg'], output_dir=output_dir)
+    open(jobs[0].path, 'w').close()
+    records = run_catalogue(jobs, num_processes=2)
+    assert [r['status'] for r in records] == ['skipped', 'ok']
+    assert os.path.exists(jobs[1].path)
+
+
+def test_run_catalogue_returns_records_in_plan_order(tmpdir):
+    output_dir = str(tmpdir)
+    jobs = plan_jobs([6], [4, 5], counts=[5], output_formats=['svg', 'json'],
+                     output_dir=output_dir)
+    open(jobs[1].path, 'w').close()
+    records = run_catalogue(jobs, num_processes=2)
+    assert [r['path'] for r in records] == [job.path for job in jobs]
+    assert [r['status'] for r in records] == ['ok', 'skipped', 'ok', 'ok']
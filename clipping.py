@@ -0,0 +1,255 @@
+"""Clip the edges of a tessellation to a region of interest before rendering.
+
+A region is either a RectangleRegion or a DiskRegion (a Euclidean disk, which
+is also how a hyperbolic disk appears in the Poincare disk model; see
+DiskRegion.hyperbolic). Clipping proceeds in three stages:
+
+ 1. The tessellation's spatial index selects the polygons whose bounding
+    boxes meet the region's bounding box, and only their (deduplicated)
+    edges are considered.
+ 2. An edge whose own bounding box misses the region's is rejected, and one
+    whose bounding box is inside the region is kept whole.
+ 3. The remaining edges cross the region's boundary. Their lines are
+    intersected with each piece of the boundary in batch, the edge is split at
+    the crossings, and the pieces whose midpoints are inside the region are
+    kept.
+
+The result is a list of ClippedEdges, each a piece of a hyperbolic line, so a
+close-up render only does work proportional to the visible region.
+"""
+
+from collections import namedtuple
+from geometry import EPSILON
+from geometry import Line
+from geometry import Point
+from geometry import VerticalLine
+from hyperbolic import PoincareDiskLine
+from mesh import IndexedMesh
+from spatial_index import arc_bounding_box
+from spatial_index import boxes_intersect
+import cmath
+import math
+
+
+class ClippedEdge(namedtuple('ClippedEdge', ['line', 'start', 'end'])):
+    """The part of a tessellation edge inside a region: the segment of line
+    (a PoincareDiskLine or a Line) from start to end.
+    """
+
+
+def intersect_circles_with_line(circles, line):
+    """Return, for each circle, the set of its intersection points with a
+    line.
+    """
+    return [circle.intersect_with_line(line) for circle in circles]
+
+
+def intersect_circles_with_circle(circles, circle):
+    """Return, for each of circles, the set of its intersection points with
+    circle.
+    """
+    return [other.intersect_with_circle(circle) for other in circles]
+
+
+class RectangleRegion(namedtuple('RectangleRegion', ['min_x', 'min_y', 'max_x', 'max_y'])):
+    def bounding_box(self):
+        return tuple(self)
+
+    def contains(self, point):
+        x, y = point
+        return (self.min_x - EPSILON <= x <= self.max_x + EPSILON
+                and self.min_y - EPSILON <= y <= self.max_y + EPSILON)
+
+    def contains_box(self, box):
+        return self.contains((box[0], box[1])) and self.contains((box[2], box[3]))
+
+    def candidate_polygons(self, spatial_index):
+        return spatial_index.query_rectangle(*self)
+
+    def circle_crossings(self, circles):
+        """Return, for each circle, the list of points where it crosses the
+        boundary of the rectangle.
+        """
+        crossings = [[] for _ in circles]
+        sides = [
+            Line(Point(0, self.min_y), 0),
+            Line(Point(0, self.max_y), 0),
+            VerticalLine.at_point(Point(self.min_x, 0)),
+            VerticalLine.at_point(Point(self.max_x, 0)),
+        ]
+        for side in sides:
+            for points, side_points in zip(crossings, intersect_circles_with_line(circles, side)):
+                points.extend(point for point in side_points if self.contains(point))
+        return crossings
+
+    def segment_crossings(self, u, v):
+        """Return the parameters t in (0, 1) at which the segment
+        u + t (v - u) crosses the boundary of the rectangle.
+        """
+        parameters = []
+        for start, delta, bounds in [(u.x, v.x - u.x, (self.min_x, self.max_x)),
+                                     (u.y, v.y - u.y, (self.min_y, self.max_y))]:
+            if abs(delta) < EPSILON:
+                continue
+            for bound in bounds:
+                parameters.append((bound - start) / delta)
+        return parameters
+
+
+class DiskRegion(namedtuple('DiskRegion', ['center', 'radius'])):
+    """A Euclidean disk."""
+
+    @staticmethod
+    def hyperbolic(center, radius):
+        """Return the region of points within hyperbolic distance radius of
+        center. Hyperbolic circles in the Poincare disk are Euclidean circles,
+        but the Euclidean center is closer to the origin than the hyperbolic
+        one.
+        """
+        c = complex(center[0], center[1])
+        if abs(c) >= 1:
+            raise ValueError("Point {} is not in the interior of the disk.".format(center))
+
+        # The hyperbolic circle of radius rho about the origin is the
+        # Euclidean circle of radius t = tanh(rho / 2). Translating it by
+        # z -> (z + c) / (conj(c) z + 1) gives a circle symmetric about the
+        # diameter through c, through the images of t c / |c| and -t c / |c|.
+        t = math.tanh(radius / 2)
+        denominator = 1 - t * t * abs(c) ** 2
+        euclidean_center = c * (1 - t * t) / denominator
+        euclidean_radius = t * (1 - abs(c) ** 2) / denominator
+        return DiskRegion(Point(euclidean_center.real, euclidean_center.imag), euclidean_radius)
+
+    def bounding_box(self):
+        return (self.center.x - self.radius, self.center.y - self.radius,
+                self.center.x + self.radius, self.center.y + self.radius)
+
+    def contains(self, point):
+        x, y = point
+        return ((x - self.center.x) ** 2 + (y - self.center.y) ** 2
+                <= (self.radius + EPSILON) ** 2)
+
+    def contains_box(self, box):
+        return all(self.contains(corner) for corner in [
+            (box[0], box[1]), (box[0], box[3]), (box[2], box[1]), (box[2], box[3])])
+
+    def candidate_polygons(self, spatial_index):
+        return spatial_index.query_disk(self.center, self.radius)
+
+    def circle_crossings(self, circles):
+        return [list(points) for points in intersect_circles_with_circle(circles, self)]
+
+    def segment_crossings(self, u, v):
+        """Return the parameters t at which the segment u + t (v - u)
+        crosses the circle: the roots of |u + t (v - u) - center|^2 = r^2.
+        """
+        d = v - u
+        f = u - self.center
+        a = d.x * d.x + d.y * d.y
+        b = 2 * (f.x * d.x + f.y * d.y)
+        c = f.x * f.x + f.y * f.y - self.radius ** 2
+        discriminant = b * b - 4 * a * c
+        if a < EPSILON or discriminant < 0:
+            return []
+        root = math.sqrt(discriminant)
+        return [(-b - root) / (2 * a), (-b + root) / (2 * a)]
+
+
+def _split(point_at, parameters, region, line):
+    """Split an edge parametrized over [0, 1] at the given parameters, and
+    return the ClippedEdges of the pieces inside the region.
+    """
+    cuts = [0.0] + sorted(t for t in parameters if EPSILON < t < 1 - EPSILON) + [1.0]
+    pieces = []
+    for a, b in zip(cuts, cuts[1:]):
+        if region.contains(point_at((a + b) / 2)):
+            pieces.append(ClippedEdge(line, point_at(a), point_at(b)))
+    return pieces
+
+
+def _arc_clipper(line, u, v):
+    """Return the parametrization of the minor arc of line from u to v, and
+    a function taking a point of the circle to its parameter.
+    """
+    center = complex(line.center.x, line.center.y)
+    start = complex(u.x, u.y) - center
+    sweep = cmath.phase((complex(v.x, v.y) - center) / start)
+
+    def point_at(t):
+        if t == 0:
+            return u
+        if t == 1:
+            return v
+        w = center + start * cmath.exp(1j * sweep * t)
+        return Point(w.real, w.imag)
+
+    def parameter_of(point):
+        return cmath.phase((complex(point.x, point.y) - center) / start) / sweep
+
+    return point_at, parameter_of
+
+
+def clip_edges(edges, region, disk_model):
+    """Clip a sequence of (u, v) edges of a tessellation to a region, and
+    return the list of ClippedEdges.
+    """
+    region_box = region.bounding_box()
+    clipped = []
+    # Arcs crossing the region boundary, intersected in batch at the end.
+    crossing_arcs = []
+
+    for u, v in edges:
+        line = disk_model.line_through(u, v)
+        is_arc = isinstance(line, PoincareDiskLine)
+        box = arc_bounding_box(line, u, v) if is_arc else (
+            min(u.x, v.x), min(u.y, v.y), max(u.x, v.x), max(u.y, v.y))
+
+        if not boxes_intersect(box, *region_box):
+            continue
+        if region.contains_box(box):
+            clipped.append(ClippedEdge(line, u, v))
+        elif is_arc:
+            crossing_arcs.append((line, u, v))
+        else:
+            clipped.extend(_split(
+                lambda t, u=u, v=v: u if t == 0 else v if t == 1 else u + (v - u) * t,
+                region.segment_crossings(u, v), region, line))
+
+    crossings = region.circle_crossings([line for line, _, _ in crossing_arcs])
+    for (line, u, v), points in zip(crossing_arcs, crossings):
+        point_at, parameter_of = _arc_clipper(line, u, v)
+        clipped.extend(_split(point_at, [parameter_of(point) for point in points], region, line))
+
+    return clipped
+
+
+def clip_tessellation(tessellation, region):
+    """Return the ClippedEdges of a tessellation inside a region, drawing
+    each edge shared by two polygons once.
+    """
+    spatial_index = getattr(tessellation, 'spatial_index', None)
+    if spatial_index is None:
+        spatial_index = tessellation.build_spatial_index()
+
+    polygons = tessellation.tessellated_polygons
+    candidates = [polygons[i] for i in region.candidate_polygons(spatial_index)]
+    mesh = IndexedMesh.from_polygons(candidates)
+    return clip_edges(mesh.iter_edge_points(), region, tessellation.disk_model)
+
+
+def render_clipped(tessellation, region, filename, canvas_width):
+    """Output an svg file drawing only the parts of the tessellation's edges
+    inside the region.
+    """
+    clipped = clip_tessellation(tessellation, region)
+    tessellation.render_drawing(canvas_width, filename=filename, polygons=[])
+    group = tessellation.polygon_group
+    for line, start, end in clipped:
+        if isinstance(line, PoincareDiskLine):
+            tessellation.render_arc(group, line, start, end)
+        else:
+            group.add(tessellation.dwg.line(
+                tessellation.transformer.in_rendered_coords(start),
+                tessellation.transformer.in_rendered_coords(end)))
+    tessellation.dwg.save()
+    return clipped
@@ -0,0 +1,132 @@
+import cmath
+import math
+
+from clipping import *
+from geometry import Point
+from hyperbolic import PoincareDiskModel
+from hyperbolic_metric import hyperbolic_distance
+from mesh import IndexedMesh
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from testing import *
+
+
+SAMPLES = 1000
+
+
+def arc_point_at(line, start, end):
+    """Parametrize the segment of line from start to end over [0, 1]."""
+    if not isinstance(line, PoincareDiskLine):
+        return lambda t: start + (end - start) * t, (end - start).norm()
+    center = complex(line.center.x, line.center.y)
+    offset = complex(*start) - center
+    angle = cmath.phase((complex(*end) - center) / offset)
+
+    def point_at(t):
+        w = center + offset * cmath.exp(1j * angle * t)
+        return Point(w.real, w.imag)
+    return point_at, abs(angle) * line.radius
+
+
+def piece_length(piece):
+    return arc_point_at(*piece)[1]
+
+
+def sampled_length_inside(tessellation, region):
+    """The length of the edges inside a region, measured by sampling each
+    edge at SAMPLES points.
+    """
+    length = 0
+    for u, v in IndexedMesh.from_tessellation(tessellation).iter_edge_points():
+        line = tessellation.disk_model.line_through(u, v)
+        point_at, edge_length = arc_point_at(line, u, v)
+        inside = sum(1 for k in range(SAMPLES) if region.contains(point_at((k + 0.5) / SAMPLES)))
+        length += edge_length * inside / SAMPLES
+    return length
+
+
+def test_hyperbolic_disk_region():
+    center, radius = Point(0.3, -0.4), 0.7
+    region = DiskRegion.hyperbolic(center, radius)
+    for k in range(12):
+        angle = 2 * math.pi * k / 12
+        boundary_point = region.center + Point(math.cos(angle), math.sin(angle)) * region.radius
+        assert_are_close(hyperbolic_distance(center, boundary_point), radius)
+
+
+def test_hyperbolic_disk_region_at_origin():
+    region = DiskRegion.hyperbolic(Point(0, 0), 1.0)
+    assert_are_close(region.center, Point(0, 0))
+    assert_are_close(region.radius, math.tanh(0.5))
+
+
+def test_intersect_circles_with_line():
+    disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+    circles = [disk_model.line_through(Point(1/2, 1/2), Point(1/2, -1/2)), disk_model]
+    crossings = intersect_circles_with_line(circles, Line(Point(0, 0), 0))
+    assert_iterables_are_close(
+        sorted(crossings[0]),
+        [Point(circles[0].center.x - circles[0].radius, 0),
+         Point(circles[0].center.x + circles[0].radius, 0)])
+    assert crossings[1] == {Point(1, 0), Point(-1, 0)}
+
+
+def test_clip_segment_to_rectangle():
+    disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+    region = RectangleRegion(-0.1, -0.1, 0.1, 0.1)
+    pieces = clip_edges([(Point(-0.5, 0), Point(0.5, 0))], region, disk_model)
+    assert len(pieces) == 1
+    assert_are_close(pieces[0].start, Point(-0.1, 0))
+    assert_are_close(pieces[0].end, Point(0.1, 0))
+
+
+def test_clip_edges_rejects_and_keeps_whole():
+    disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+    region = RectangleRegion(-0.5, -0.5, 0.5, 0.5)
+    inside = (Point(0.1, 0.2), Point(0.2, 0.1))
+    outside = (Point(0.7, 0.1), Point(0.7, -0.1))
+    pieces = clip_edges([inside, outside], region, disk_model)
+    assert len(pieces) == 1
+    assert pieces[0].start == inside[0]
+    assert pieces[0].end == inside[1]
+
+
+def test_clip_tessellation_to_rectangle():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(6, 4), max_polygon_count=300)
+    region = RectangleRegion(0.1, -0.2, 0.6, 0.35)
+    pieces = clip_tessellation(tessellation, region)
+
+    assert 0 < len(pieces) < IndexedMesh.from_tessellation(tessellation).num_edges
+    for piece in pieces:
+        assert region.contains(piece.start)
+        assert region.contains(piece.end)
+    assert_that_lengths_match(sum(piece_length(piece) for piece in pieces),
+                              sampled_length_inside(tessellation, region))
+
+
+def test_clip_tessellation_to_hyperbolic_disk():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=300)
+    region = DiskRegion.hyperbolic(Point(-0.2, 0.3), 1.2)
+    pieces = clip_tessellation(tessellation, region)
+
+    assert pieces
+    for piece in pieces:
+        assert region.contains(piece.start)
+        assert region.contains(piece.end)
+    assert_that_lengths_match(sum(piece_length(piece) for piece in pieces),
+                              sampled_length_inside(tessellation, region))
+
+
+def assert_that_lengths_match(clipped_length, sampled_length):
+    assert abs(clipped_length - sampled_length) < 1e-3 * sampled_length
+
+
+def test_render_clipped(tmpdir):
+    tessellation = HyperbolicTessellation(TessellationConfiguration(6, 4), max_polygon_count=100)
+    region = RectangleRegion(-0.3, -0.3, 0.3, 0.3)
+    filename = str(tmpdir.join('clipped.svg'))
+    pieces = render_clipped(tessellation, region, filename, canvas_width=200)
+
+    with open(filename) as f:
+        svg = f.read()
+    assert svg.count('<path') + svg.count('<line') == len(pieces)
@@ -0,0 +1,507 @@
+"""A compact array representation of a TessellationGraph.
+
+Vertices are identified by a single integer id: the vertices of layer k have
+ids layer_offsets[k], ..., layer_offsets[k + 1] - 1, in the same order as the
+layer lists of a TessellationGraph. Adjacency is stored in compressed sparse
+row (CSR) form: the neighbors of vertex v are
+
+    neighbors[offsets[v]:offsets[v + 1]]
+
+listed in the same counterclockwise order as the edges of the corresponding
+Vertex in a TessellationGraph.
+
+A graph can be saved to a binary file (see binary_io) and loaded back through
+a memory map, so opening even a deep graph is immediate, and processes
+loading the same file share its pages read-only.
+"""
+
+from array import array
+from binary_io import read_arrays
+from binary_io import write_arrays
+from bisect import bisect_right
+from tessellation import TessellationConfiguration
+
+
+# Connection types with the previous layer, as stored in connection_types.
+# See tessellation_graph.Vertex for their meaning.
+CENTER = 0
+EDGE = 1
+VERTEX = 2
+
+CONNECTION_TYPE_NAMES = {CENTER: None, EDGE: "edge", VERTEX: "vertex"}
+CONNECTION_TYPE_CODES = {name: code for code, name in CONNECTION_TYPE_NAMES.items()}
+
+# Typecodes for vertex ids in the neighbor list and for offsets into it. 32 bit
+# ids suffice for graphs of up to two billion vertices, while the neighbor list
+# itself can be longer than that.
+ID_TYPECODE = 'i'
+OFFSET_TYPECODE = 'q'
+
+MAGIC = b'HYPGRF01'
+
+
+class CompactTessellationGraph(object):
+    """A TessellationGraph stored as flat arrays, suitable for graphs with tens
+    of millions of vertices.
+
+    Attributes:
+        configuration: the TessellationConfiguration of the graph.
+        layer_offsets: num_layers + 1 prefix sums of the layer sizes.
+        connection_types: one of CENTER, EDGE, VERTEX per vertex.
+        offsets: num_vertices + 1 offsets into neighbors.
+        neighbors: the concatenated neighbor lists.
+        mapped: the MappedArrays backing the arrays, for loaded graphs.
+    """
+
+    def __init__(self, configuration, layer_offsets, connection_types, offsets, neighbors,
+                 mapped=None):
+        self.configuration = configuration
+        self.layer_offsets = layer_offsets
+        self.connection_types = connection_types
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.mapped = mapped
+
+    @staticmethod
+    def build(tessellation_configuration, num_layers=2):
+        """Construct the graph directly in array form, without creating any
+        Vertex or Edge objects. The result is identical to
+        CompactTessellationGraph.from_graph(TessellationGraph(...)).
+        """
+        return _CompactGraphBuilder(tessellation_configuration).build(num_layers)
+
+    @staticmethod
+    def build_from_sectors(tessellation_configuration, num_layers=2):
+        """Construct the same graph as build, running the layer connection
+        procedure on only one of the p symmetric sectors of each layer, and
+        filling in the others by index arithmetic.
+        """
+        return _SectorGraphBuilder(tessellation_configuration).build(num_layers)
+
+    @staticmethod
+    def from_graph(graph):
+        """Convert a TessellationGraph to its compact form."""
+        layer_offsets = array(OFFSET_TYPECODE, [0])
+        for layer in graph.layers:
+            layer_offsets.append(layer_offsets[-1] + len(layer))
+
+        def vertex_id(vertex):
+            return layer_offsets[vertex.layer] + vertex.index_in_layer
+
+        connection_types = array('b')
+        offsets = array(OFFSET_TYPECODE, [0])
+        neighbors = array(ID_TYPECODE)
+        for layer in graph.layers:
+            for vertex in layer:
+                connection_types.append(
+                    CONNECTION_TYPE_CODES[vertex.previous_layer_connection_type])
+                neighbors.extend(vertex_id(edge.other(vertex)) for edge in vertex.edges)
+                offsets.append(len(neighbors))
+
+        return CompactTessellationGraph(
+            graph.configuration, layer_offsets, connection_types, offsets, neighbors)
+
+    @property
+    def num_layers(self):
+        return len(self.layer_offsets) - 1
+
+    @property
+    def num_vertices(self):
+        return len(self.offsets) - 1
+
+    def layer_size(self, layer):
+        return self.layer_offsets[layer + 1] - self.layer_offsets[layer]
+
+    def layer_range(self, layer):
+        """The range of vertex ids in the given layer."""
+        return range(self.layer_offsets[layer], self.layer_offsets[layer + 1])
+
+    def vertex_id(self, layer, index_in_layer):
+        if not 0 <= index_in_layer < self.layer_size(layer):
+            raise IndexError("Layer {} has no vertex {}".format(layer, index_in_layer))
+        return self.layer_offsets[layer] + index_in_layer
+
+    def layer_and_index(self, vertex_id):
+        """Return the (layer, index_in_layer) pair of a vertex id."""
+        layer = bisect_right(self.layer_offsets, vertex_id) - 1
+        if not 0 <= layer < self.num_layers:
+            raise IndexError("No vertex with id {}".format(vertex_id))
+        return layer, vertex_id - self.layer_offsets[layer]
+
+    def neighbors_of(self, vertex_id):
+        """The neighbor ids of a vertex, in counterclockwise order."""
+        return self.neighbors[self.offsets[vertex_id]:self.offsets[vertex_id + 1]]
+
+    def degree(self, vertex_id):
+        return self.offsets[vertex_id + 1] - self.offsets[vertex_id]
+
+    def connection_type(self, vertex_id):
+        """The previous_layer_connection_type of a vertex: None, "edge" or
+        "vertex".
+        """
+        return CONNECTION_TYPE_NAMES[self.connection_types[vertex_id]]
+
+    def save(self, path):
+        write_arrays(
+            path,
+            MAGIC,
+            {
+                'p': self.configuration.numPolygonSides,
+                'q': self.configuration.numPolygonsPerVertex,
+            },
+            [
+                ('layer_offsets', self.layer_offsets),
+                ('connection_types', self.connection_types),
+                ('offsets', self.offsets),
+                ('neighbors', self.neighbors),
+            ])
+
+    @staticmethod
+    def load(path):
+        """Memory-map a graph written by save. The arrays of the result are
+        read-only memoryviews; call close() when done with it.
+        """
+        mapped = read_arrays(path, MAGIC)
+        configuration = TessellationConfiguration(mapped.metadata['p'], mapped.metadata['q'])
+        return CompactTessellationGraph(
+            configuration,
+            mapped.arrays['layer_offsets'],
+            mapped.arrays['connection_types'],
+            mapped.arrays['offsets'],
+            mapped.arrays['neighbors'],
+            mapped=mapped)
+
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+
+
+class _CompactGraphBuilder(object):
+    """Runs the layer connection procedure of TessellationGraph.connect_layer
+    on integer ids.
+
+    Only two layers are ever held in working storage. The edge list of each
+    vertex in a working layer is a fixed-size slot of p + 1 entries in one
+    flat array, with one spare entry at the front: the only edge ever
+    prepended to a list (the cyclic edge added by the next vertex in the
+    layer) goes there, so the slot behaves like the deque of a Vertex.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self.p = configuration.numPolygonSides
+        self.q = configuration.numPolygonsPerVertex
+        self.slot_size = self.p + 1
+
+    def build(self, num_layers):
+        self.layer_offsets = array(OFFSET_TYPECODE, [0, 1])
+        self.connection_types = array('b', [CENTER])
+        self.offsets = array(OFFSET_TYPECODE, [0])
+        self.neighbors = array(ID_TYPECODE)
+
+        # The layer whose edges to the next layer are being added.
+        layer_index = 0
+        this_layer = self._new_layer(1)
+
+        for layer_index in range(1, num_layers):
+            next_size = self._next_layer_size(layer_index)
+            self.layer_offsets.append(self.layer_offsets[-1] + next_size)
+            next_layer = self._new_layer(next_size)
+            self._connect_layer(layer_index - 1, this_layer, next_layer)
+            self._flush(this_layer)
+            this_layer = next_layer
+
+        if layer_index > 0:
+            self._connect_cyclic_only(layer_index, this_layer)
+        self._flush(this_layer)
+
+        return CompactTessellationGraph(
+            self.configuration, self.layer_offsets, self.connection_types,
+            self.offsets, self.neighbors)
+
+    def _new_layer(self, size):
+        return _LayerSlots(size, self.slot_size)
+
+    def _next_layer_size(self, layer_index):
+        p, q = self.p, self.q
+        if layer_index == 1:
+            return p * (q - 2)
+
+        types = self.connection_types
+        start = self.layer_offsets[layer_index - 1]
+        end = self.layer_offsets[layer_index]
+        num_edge_type = sum(1 for i in range(start, end) if types[i] == EDGE)
+        num_vertex_type = (end - start) - num_edge_type
+        return (num_edge_type * ((p - 3) * (q - 2) - 1)
+                + num_vertex_type * ((p - 2) * (q - 2) - 1))
+
+    def _add_cyclic_edge(self, layer_index, layer, index):
+        start = self.layer_offsets[layer_index]
+        previous = (index - 1) % layer.size
+        previous_id = start + previous
+        if not layer.contains(index, previous_id):
+            layer.append(index, previous_id)
+            layer.appendleft(previous, start + index)
+
+    def _connect_cyclic_only(self, layer_index, layer):
+        for index in range(layer.size):
+            self._add_cyclic_edge(layer_index, layer, index)
+
+    def _connect_layer(self, layer_index, this_layer, next_layer):
+        """The integer version of TessellationGraph.connect_layer. See there
+        for a description of the procedure.
+        """
+        p, q = self.p, self.q
+        this_start = self.layer_offsets[layer_index]
+        next_start = self.layer_offsets[layer_index + 1]
+        connection_types = self.connection_types
+        connection_types.extend(bytes(next_layer.size))
+
+        next_index = 0
+        for index in range(this_layer.size):
+            remaining = this_layer.size - index - 1
+            if layer_index > 0:
+                self._add_cyclic_edge(layer_index, this_layer, index)
+
+            if layer_index == 0 or remaining == 0:
+                maximal_degree = p
+            else:
+                maximal_degree = p - 1
+
+            while this_layer.degree(index) < maximal_degree:
+                if next_index >= next_layer.size:
+                    raise ValueError(
+                        "Layer {} ran out of vertices; configuration {} is not "
+                        "supported.".format(layer_index + 1, self.configuration))
+                this_layer.append(index, next_start + next_index)
+                next_layer.append(next_index, this_start + index)
+                connection_types[next_start + next_index] = EDGE
+                next_index += 1
+
+                if this_layer.degree(index) == maximal_degree:
+                    num_vertices_to_skip = q - 4
+                    if remaining > 1 and this_layer.degree(index + 1) == p - 2:
+                        num_vertices_to_skip -= 1
+                else:
+                    num_vertices_to_skip = q - 3
+
+                for i in range(num_vertices_to_skip):
+                    connection_types[next_start + next_index] = VERTEX
+                    next_index += 1
+                    if next_index == next_layer.size:
+                        break
+
+    def _flush(self, layer):
+        """Append the (now complete) edge lists of a layer to the CSR arrays."""
+        for index in range(layer.size):
+            self.neighbors.extend(layer.edges(index))
+            self.offsets.append(len(self.neighbors))
+
+
+class _LayerSlots(object):
+    def __init__(self, size, slot_size):
+        self.size = size
+        self.slot_size = slot_size
+        self.slots = array(ID_TYPECODE, bytes(size * slot_size * array(ID_TYPECODE).itemsize))
+        self.heads = array('b', [1]) * size
+        self.tails = array('b', [1]) * size
+
+    def degree(self, index):
+        return self.tails[index] - self.heads[index]
+
+    def append(self, index, vertex_id):
+        self.slots[index * self.slot_size + self.tails[index]] = vertex_id
+        self.tails[index] += 1
+
+    def appendleft(self, index, vertex_id):
+        if self.heads[index] == 0:
+            raise ValueError("Vertex {} has no room to prepend an edge".format(index))
+        self.heads[index] -= 1
+        self.slots[index * self.slot_size + self.heads[index]] = vertex_id
+
+    def edges(self, index):
+        base = index * self.slot_size
+        return self.slots[base + self.heads[index]:base + self.tails[index]]
+
+    def contains(self, index, vertex_id):
+        return vertex_id in self.edges(index)
+
+
+def _sector_entry(layer_delta, index):
+    """Encode a neighbor in a sector edge list: the vertex with the given
+    index relative to sector 0 of the layer layer_delta (-1, 0 or 1) away.
+    The index may be -1 or the sector size, for the neighbors of the first
+    and last vertices of the sector in the adjacent sectors.
+    """
+    return 3 * index + layer_delta + 1
+
+
+def _decode_sector_entry(entry):
+    index, layer_delta = divmod(entry, 3)
+    return layer_delta - 1, index
+
+
+class _SectorGraphBuilder(object):
+    """Builds a CompactTessellationGraph from one sector of each layer.
+
+    Every layer k >= 1 of a TessellationGraph has p-fold cyclic symmetry: it
+    splits into p sectors of s_k consecutive vertices, and the neighbors of
+    vertex j s_k + i are those of vertex i, each shifted by j sectors of its
+    own layer (modulo the layer size). So it suffices to run connect_layer on
+    sector 0 of each layer, treating it as one sector among others rather
+    than as the start of a cyclic layer, and replicate its edge lists p times.
+
+    The one exception to the symmetry is the last vertex of layer 1, which
+    the center vertex's edges skip over without assigning it a connection
+    type, so it keeps the type of the center.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self.p = configuration.numPolygonSides
+        self.q = configuration.numPolygonsPerVertex
+        self.slot_size = self.p + 1
+
+    def build(self, num_layers):
+        p, q = self.p, self.q
+        self.layer_offsets = array(OFFSET_TYPECODE, [0, 1])
+        self.connection_types = array('b', [CENTER])
+        self.offsets = array(OFFSET_TYPECODE, [0])
+        self.neighbors = array(ID_TYPECODE)
+        self.sector_sizes = [1]
+
+        if num_layers < 2:
+            self.offsets.append(0)
+            return self._result()
+
+        # The center vertex has an edge to the first vertex of each sector
+        # of layer 1, and skips the q - 3 others.
+        self._add_layer(q - 2)
+        this_layer = _LayerSlots(q - 2, self.slot_size)
+        this_layer.append(0, _sector_entry(-1, 0))
+        this_types = array('b', [EDGE] + [VERTEX] * (q - 3))
+        self.neighbors.extend(1 + sector * (q - 2) for sector in range(p))
+        self.offsets.append(len(self.neighbors))
+
+        for layer_index in range(1, num_layers - 1):
+            next_size = sum(
+                (p - 3) * (q - 2) - 1 if connection_type == EDGE else (p - 2) * (q - 2) - 1
+                for connection_type in this_types)
+            self._add_layer(next_size)
+            next_layer = _LayerSlots(next_size, self.slot_size)
+            next_types = array('b', bytes(next_size))
+            self._connect_sector(layer_index, this_layer, next_layer, next_types)
+            self._flush(layer_index, this_layer, this_types)
+            this_layer, this_types = next_layer, next_types
+
+        self._connect_cyclic_only(this_layer)
+        self._flush(num_layers - 1, this_layer, this_types)
+        self.connection_types[self.layer_offsets[2] - 1] = CENTER
+        return self._result()
+
+    def _result(self):
+        return CompactTessellationGraph(
+            self.configuration, self.layer_offsets, self.connection_types,
+            self.offsets, self.neighbors)
+
+    def _add_layer(self, sector_size):
+        self.sector_sizes.append(sector_size)
+        self.layer_offsets.append(self.layer_offsets[-1] + self.p * sector_size)
+
+    def _add_cyclic_edge(self, layer, index):
+        """Add the edge from a vertex to the previous one in its layer. The
+        matching edge of the last vertex of the sector, to the first vertex
+        of the next sector, is added by _close_sector.
+        """
+        layer.append(index, _sector_entry(0, index - 1))
+        if index > 0:
+            layer.appendleft(index - 1, _sector_entry(0, index))
+
+    def _close_sector(self, layer):
+        layer.appendleft(layer.size - 1, _sector_entry(0, layer.size))
+
+    def _connect_cyclic_only(self, layer):
+        for index in range(layer.size):
+            self._add_cyclic_edge(layer, index)
+        self._close_sector(layer)
+
+    def _connect_sector(self, layer_index, this_layer, next_layer, next_types):
+        """TessellationGraph.connect_layer on sector 0 of a layer k >= 1. No
+        vertex of the sector is the last of its layer, so each has maximal
+        degree p - 1 while its edges to the next layer are added.
+        """
+        p, q = self.p, self.q
+        maximal_degree = p - 1
+        # The first vertex of the next sector has the degree of the first
+        # vertex of this one before it was processed.
+        first_degree = this_layer.degree(0)
+
+        next_index = 0
+        for index in range(this_layer.size):
+            self._add_cyclic_edge(this_layer, index)
+
+            while this_layer.degree(index) < maximal_degree:
+                if next_index >= next_layer.size:
+                    raise ValueError(
+                        "Layer {} ran out of vertices; configuration {} is not "
+                        "supported.".format(layer_index + 1, self.configuration))
+                this_layer.append(index, _sector_entry(1, next_index))
+                next_layer.append(next_index, _sector_entry(-1, index))
+                next_types[next_index] = EDGE
+                next_index += 1
+
+                if this_layer.degree(index) == maximal_degree:
+                    num_vertices_to_skip = q - 4
+                    next_degree = (this_layer.degree(index + 1)
+                                   if index + 1 < this_layer.size else first_degree)
+                    if next_degree == p - 2:
+                        num_vertices_to_skip -= 1
+                else:
+                    num_vertices_to_skip = q - 3
+
+                for i in range(num_vertices_to_skip):
+                    if next_index >= next_layer.size:
+                        raise ValueError(
+                            "Layer {} ran out of vertices; configuration {} is not "
+                            "supported.".format(layer_index + 1, self.configuration))
+                    next_types[next_index] = VERTEX
+                    next_index += 1
+
+        if next_index != next_layer.size:
+            raise ValueError(
+                "Layer {} is not symmetric; configuration {} is not "
+                "supported.".format(layer_index + 1, self.configuration))
+        self._close_sector(this_layer)
+
+    def _flush(self, layer_index, layer, types):
+        """Append the edge lists and connection types of all p sectors of a
+        layer to the CSR arrays.
+        """
+        # Decode the neighbors of sector 0 once into the offset of their
+        # layer, their index in sector 0, and the sector and layer sizes to
+        # shift them by.
+        decoded = []
+        degrees = []
+        for index in range(layer.size):
+            edges = layer.edges(index)
+            degrees.append(len(edges))
+            for entry in edges:
+                layer_delta, neighbor_index = _decode_sector_entry(entry)
+                neighbor_layer = layer_index + layer_delta
+                sector_size = self.sector_sizes[neighbor_layer]
+                decoded.append((
+                    self.layer_offsets[neighbor_layer],
+                    neighbor_index,
+                    sector_size if neighbor_layer > 0 else 0,
+                    self.p * sector_size))
+
+        for sector in range(self.p):
+            end = self.offsets[-1]
+            for degree in degrees:
+                end += degree
+                self.offsets.append(end)
+            self.neighbors.extend([
+                start + (index + sector * sector_size) % layer_size
+                for start, index, sector_size, layer_size in decoded])
+        self.connection_types.extend(types * self.p)
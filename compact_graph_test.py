@@ -0,0 +1,118 @@
+import pytest
+
+from compact_graph import *
+from tessellation import TessellationConfiguration
+from tessellation_graph import TessellationGraph
+
+
+@pytest.mark.parametrize("p,q,num_layers", [(6, 4, 4), (3, 7, 5), (4, 5, 4), (5, 5, 3)])
+def test_build_matches_converted_object_graph(p, q, num_layers):
+    config = TessellationConfiguration(p, q)
+    converted = CompactTessellationGraph.from_graph(TessellationGraph(config, num_layers))
+    built = CompactTessellationGraph.build(config, num_layers)
+
+    assert list(built.layer_offsets) == list(converted.layer_offsets)
+    assert list(built.connection_types) == list(converted.connection_types)
+    assert list(built.offsets) == list(converted.offsets)
+    assert list(built.neighbors) == list(converted.neighbors)
+
+
+def test_layer_offsets_and_ids():
+    graph = CompactTessellationGraph.build(TessellationConfiguration(6, 4), num_layers=3)
+    assert list(graph.layer_offsets) == [0, 1, 13, 85]
+    assert graph.num_layers == 3
+    assert graph.num_vertices == 85
+    assert graph.vertex_id(2, 5) == 18
+    assert graph.layer_and_index(18) == (2, 5)
+    assert graph.layer_and_index(0) == (0, 0)
+    with pytest.raises(IndexError):
+        graph.vertex_id(1, 12)
+    with pytest.raises(IndexError):
+        graph.layer_and_index(85)
+
+
+def test_neighbors_keep_counterclockwise_edge_order():
+    config = TessellationConfiguration(6, 4)
+    graph = TessellationGraph(config, num_layers=3)
+    compact = CompactTessellationGraph.build(config, num_layers=3)
+
+    vertex = graph.vertex_at(1, 3)
+    expected = [
+        compact.vertex_id(edge.other(vertex).layer, edge.other(vertex).index_in_layer)
+        for edge in vertex.edges
+    ]
+    assert list(compact.neighbors_of(compact.vertex_id(1, 3))) == expected
+    assert compact.degree(0) == 6
+    assert list(compact.neighbors_of(0)) == [1, 3, 5, 7, 9, 11]
+
+
+def test_connection_types():
+    graph = CompactTessellationGraph.build(TessellationConfiguration(6, 4), num_layers=2)
+    assert graph.connection_type(0) is None
+    assert graph.connection_type(graph.vertex_id(1, 0)) == "edge"
+    assert graph.connection_type(graph.vertex_id(1, 1)) == "vertex"
+
+
+def test_build_rejects_unsupported_configuration():
+    with pytest.raises(ValueError):
+        CompactTessellationGraph.build(TessellationConfiguration(7, 3), num_layers=3)
+
+
+@pytest.mark.parametrize("p,q,num_layers", [
+    (6, 4, 5), (3, 7, 6), (4, 5, 5), (5, 5, 4), (3, 9, 4), (6, 4, 2), (6, 4, 1)])
+def test_build_from_sectors_matches_build(p, q, num_layers):
+    config = TessellationConfiguration(p, q)
+    built = CompactTessellationGraph.build(config, num_layers)
+    from_sectors = CompactTessellationGraph.build_from_sectors(config, num_layers)
+
+    assert list(from_sectors.layer_offsets) == list(built.layer_offsets)
+    assert list(from_sectors.connection_types) == list(built.connection_types)
+    assert list(from_sectors.offsets) == list(built.offsets)
+    assert list(from_sectors.neighbors) == list(built.neighbors)
+
+
+def test_build_from_sectors_rejects_unsupported_configuration():
+    with pytest.raises(ValueError):
+        CompactTessellationGraph.build_from_sectors(TessellationConfiguration(7, 3), num_layers=3)
+
+
+def test_save_and_load(tmpdir):
+    config = TessellationConfiguration(5, 4)
+    graph = CompactTessellationGraph.build(config, num_layers=5)
+    path = str(tmpdir.join('graph.bin'))
+    graph.save(path)
+
+    loaded = CompactTessellationGraph.load(path)
+    assert loaded.configuration == config
+    assert loaded.num_layers == 5
+    assert loaded.num_vertices == graph.num_vertices
+    assert list(loaded.layer_offsets) == list(graph.layer_offsets)
+    assert list(loaded.connection_types) == list(graph.connection_types)
+    assert list(loaded.offsets) == list(graph.offsets)
+    assert list(loaded.neighbors) == list(graph.neighbors)
+
+    vertex_id = loaded.vertex_id(3, 7)
+    assert loaded.layer_and_index(vertex_id) == (3, 7)
+    assert list(loaded.neighbors_of(vertex_id)) == list(graph.neighbors_of(vertex_id))
+    assert loaded.connection_type(vertex_id) == graph.connection_type(vertex_id)
+    loaded.close()
+
+
+def test_load_rejects_other_files(tmpdir):
+    path = str(tmpdir.join('graph.bin'))
+    with open(path, 'wb') as f:
+        f.write(b'NOTAGRPH' + bytes(64))
+    with pytest.raises(ValueError):
+        CompactTessellationGraph.load(path)
+
+
+def test_close_with_live_neighbor_list(tmpdir):
+    graph = CompactTessellationGraph.build(TessellationConfiguration(6, 4), num_layers=3)
+    path = str(tmpdir.join('graph.bin'))
+    graph.save(path)
+
+    loaded = CompactTessellationGraph.load(path)
+    held = loaded.neighbors_of(5)
+    loaded.close()
+    loaded.close()
+    assert list(held) == list(graph.neighbors_of(5))
@@ -254,10 +254,43 @@ class Circle(namedtuple('Circle', ['center', 'radius'])):
                     Point(x, line.y_value(x)) for x in x_values
                     )
 
+    def intersect_with_circle(self, circle):
+        """Return a possibly empty set containing the points of intersection
+        of the context circle and the given circle.
+
+        The intersection points lie on the radical line of the two circles,
+        which is perpendicular to the line between their centers, at distance
+        a from self.center along it, where a is found by subtracting the two
+        circle equations.
+        """
+        c1, r1 = self.center, self.radius
+        c2, r2 = circle.center, circle.radius
+        d = distance(c1, c2)
+        if d < EPSILON:
+            return set()
+
+        a = (d ** 2 + r1 ** 2 - r2 ** 2) / (2 * d)
+        h_squared = r1 ** 2 - a ** 2
+        if h_squared < 0:
+            # Only round up, since circles meeting at a small angle (like a
+            # short geodesic near the boundary and the boundary itself) have
+            # legitimately small positive h_squared.
+            if h_squared < -EPSILON:
+                return set()
+            h_squared = 0
+
+        h = math.sqrt(h_squared)
+        u = Point((c2.x - c1.x) / d, (c2.y - c1.y) / d)
+        foot = c1 + u * a
+        return set([
+            Point(foot.x - h * u.y, foot.y + h * u.x),
+            Point(foot.x + h * u.y, foot.y - h * u.x),
+        ])
+
 
 def distance(p1, p2):
     """Compute the usual Euclidean plane distance between two points."""
-    return math.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] + p2[1]) ** 2)
+    return math.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2)
 
 
 def det3(A):
@@ -351,34 +384,27 @@ def circle_through_points_perpendicular_to_circle(point1, point2, circle):
     # detminor stands for "determinant of (matrix) minor"
     detminor_1_2 = det3(remove_column(M, 1))
     detminor_1_3 = det3(remove_column(M, 2))
-    detminor_1_4 = det3(remove_column(M, 3))
 
     circle_center_x = 0.5 * detminor_1_2 / detminor_1_1
     circle_center_y = -0.5 * detminor_1_3 / detminor_1_1
-    circle_radius = (
-        circle_center_x ** 2
-        + circle_center_y ** 2
-        + detminor_1_4 / detminor_1_1
-    ) ** 0.5
+    circle_center = Point(circle_center_x, circle_center_y)
 
-    return Circle(Point(circle_center_x, circle_center_y), circle_radius)
+    # The radius could also be read off the determinants, as the square root
+    # of x0^2 + y0^2 + det(minor 1,4) / detminor_1_1, but for points near the
+    # boundary that sum cancels badly and can come out negative. The distance
+    # to a point on the circle is always real.
+    return Circle(circle_center, distance(circle_center, point1))
 
 
 def rotate_around_origin(angle, point):
     """Rotate the given point about the origin by the given angle (in radians).
     For the disk model, this is the same operation in Euclidean space: the
-    application of a 2x2 rotation matrix.
+    application of a 2x2 rotation matrix. To rotate many points, or compose
+    rotations with other isometries, use mobius.MobiusTransform.
     """
-    rotation_matrix = [
-        [math.cos(angle), -math.sin(angle)],
-        [math.sin(angle), math.cos(angle)],
-    ]
-
+    cos, sin = math.cos(angle), math.sin(angle)
     x, y = point
-    return Point(
-        rotation_matrix[0][0] * x + rotation_matrix[0][1] * y,
-        rotation_matrix[1][0] * x + rotation_matrix[1][1] * y,
-    )
+    return Point(cos * x - sin * y, sin * x + cos * y)
 
 
 def intersection_of_common_tangents(circle, point1, point2):
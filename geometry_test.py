@@ -221,6 +221,20 @@ def test_circle_through_points_with_one_point_on_circle():
     assert_are_close(expected_circle.radius, actual_circle.radius)
 
 
+def test_circle_through_points_near_circle_has_real_radius():
+    # An edge of a {8, 4} tessellation close to the boundary, where the
+    # determinant formula for the radius squared cancels to a negative number.
+    reference_circle = Circle(Point(0, 0), 1)
+    p1 = Point(0.6492064966011896, 0.7606075628135476)
+    p2 = Point(0.6492110092034208, 0.7606035849339907)
+
+    actual_circle = circle_through_points_perpendicular_to_circle(p1, p2, reference_circle)
+    assert isinstance(actual_circle.radius, float)
+    assert actual_circle.radius > 0
+    for point in [p1, p2]:
+        assert abs(distance(actual_circle.center, point) - actual_circle.radius) < 1e-6
+
+
 def test_reflect_increasing_slope():
     line = Line(Point(0, 0), 1)
     assert_are_close(line.reflect(Point(2, -2)), Point(-2, 2))
@@ -285,6 +299,27 @@ def test_circle_intersect_with_line_empty():
     assert_that(circle.intersect_with_line(line)).is_empty()
 
 
+def test_circle_intersect_with_circle():
+    circle = Circle(Point(0, 0), 1)
+    other = Circle(Point(2, 0), 3 ** 0.5)
+    assert_iterables_are_close(
+        sorted(circle.intersect_with_circle(other)),
+        [Point(0.5, -(0.75 ** 0.5)), Point(0.5, 0.75 ** 0.5)])
+
+
+def test_circle_intersect_with_circle_tangent():
+    circle = Circle(Point(0, 0), 1)
+    other = Circle(Point(0, 3), 2)
+    assert_iterables_are_close(circle.intersect_with_circle(other), [Point(0, 1)])
+
+
+def test_circle_intersect_with_circle_empty():
+    circle = Circle(Point(0, 0), 1)
+    assert circle.intersect_with_circle(Circle(Point(3, 0), 1)) == set()
+    assert circle.intersect_with_circle(Circle(Point(0.1, 0), 0.2)) == set()
+    assert circle.intersect_with_circle(Circle(Point(0, 0), 2)) == set()
+
+
 def test_orientation_counterclockwise():
     p1 = Point(1, 1)
     p2 = Point(2, 2)
@@ -310,3 +345,8 @@ def test_orientation_collinear():
 def test_det3_error():
     with pytest.raises(ValueError):
         det3([])
+
+
+def test_distance():
+    assert_are_close(distance(Point(1, 2), Point(4, 6)), 5)
+    assert_are_close(distance(Point(0, 1), Point(0, -1)), 2)
@@ -0,0 +1,90 @@
+"""Attach Poincare disk coordinates to the vertices of a TessellationGraph.
+
+Each vertex of a TessellationGraph represents a polygon. Walking the graph
+layer by layer, each vertex gets its polygon by reflecting an already placed
+neighbor's polygon across the side the two polygons share. This produces the
+geometry of the tessellation together with its adjacency, without the
+floating point deduplication done by HyperbolicTessellation.tessellate.
+
+The polygon of each vertex is stored as vertex.polygon, a list of p points in
+counterclockwise order, rotated so that the j-th edge of the vertex (in the
+counterclockwise order of vertex.edges) crosses the polygon side from
+polygon[j] to polygon[(j + 1) % p].
+"""
+
+from geometry import Point
+from hyperbolic import PoincareDiskModel
+from hyperbolic import compute_center_polygon
+
+
+def iter_layers_with_polygons(graph, disk_model=None):
+    """Iterate over the layers of the graph as in graph.iter_layers, setting
+    vertex.polygon for each vertex of a layer before yielding it.
+
+    This works with lazy and windowed graphs, since placing a layer only
+    requires the polygons and edges of the layer before it. A layer is only
+    yielded once the layer after it exists, so a windowed graph must keep at
+    least three layers.
+    """
+    if graph.window is not None and graph.window < 3:
+        raise ValueError("Placing polygons requires a window of at least 3 layers.")
+    if disk_model is None:
+        disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+
+    for layer in graph.iter_layers():
+        for vertex in layer:
+            if vertex.layer == 0:
+                vertex.polygon = compute_center_polygon(graph.configuration, disk_model)
+            else:
+                place_polygon(vertex, disk_model)
+        yield layer
+
+
+def attach_polygons(graph, disk_model=None):
+    """Set vertex.polygon for every vertex of a (bounded) graph, and return
+    the graph.
+    """
+    for layer in iter_layers_with_polygons(graph, disk_model=disk_model):
+        pass
+    return graph
+
+
+def place_polygon(vertex, disk_model):
+    """Compute vertex.polygon by reflecting the polygon of the first neighbor
+    of vertex that has already been placed.
+
+    Neighbors in the previous layer are always placed first. Vertices that
+    only share a polygon vertex with the previous layer have no such
+    neighbor, but the previous vertex in their own layer is placed before
+    them, since the first vertex of every layer shares an edge with the
+    previous layer.
+    """
+    for edge_index, edge in enumerate(vertex.edges):
+        neighbor = edge.other(vertex)
+        if getattr(neighbor, 'polygon', None) is not None:
+            break
+    else:
+        raise ValueError("{} has no neighbor with a polygon".format(vertex))
+
+    neighbor_polygon = neighbor.polygon
+    p = len(neighbor_polygon)
+    side = next(
+        j for j, neighbor_edge in enumerate(neighbor.edges)
+        if neighbor_edge.other(neighbor) is vertex)
+
+    u, v = neighbor_polygon[side], neighbor_polygon[(side + 1) % p]
+    line = disk_model.line_through(u, v)
+
+    """Reflection reverses orientation, so reverse the reflected points to
+    get a counterclockwise polygon. Its shared side then runs from v to u, at
+    position p - 2 - side. Rotate it into position edge_index.
+    """
+    reflected = [line.reflect(point) for point in reversed(neighbor_polygon)]
+    shared_side = (p - 2 - side) % p
+    shift = shared_side - edge_index
+    polygon = [reflected[(k + shift) % p] for k in range(p)]
+
+    # Use the exact shared points rather than their reflections.
+    polygon[edge_index] = v
+    polygon[(edge_index + 1) % p] = u
+    vertex.polygon = polygon
@@ -0,0 +1,59 @@
+import pytest
+
+from graph_geometry import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from tessellation_graph import TessellationGraph
+from testing import *
+
+
+def assert_shared_sides_match(graph, layers):
+    p = graph.configuration.numPolygonSides
+    for layer in layers:
+        for vertex in layer:
+            for j, edge in enumerate(vertex.edges):
+                neighbor = edge.other(vertex)
+                if neighbor.polygon is None or not neighbor.edges:
+                    continue
+                k = next(i for i, e in enumerate(neighbor.edges) if e.other(neighbor) is vertex)
+                assert_are_close(vertex.polygon[j], neighbor.polygon[(k + 1) % p])
+                assert_are_close(vertex.polygon[(j + 1) % p], neighbor.polygon[k])
+
+
+def same_vertices(polygon1, polygon2):
+    return all(any(is_close(u, v) for v in polygon2) for u in polygon1)
+
+
+def test_center_polygon_matches_tessellation():
+    config = TessellationConfiguration(6, 4)
+    graph = attach_polygons(TessellationGraph(config, num_layers=2))
+    tessellation = HyperbolicTessellation(config, max_polygon_count=0)
+    assert_iterables_are_close(graph.vertex_at(0, 0).polygon, tessellation.center_polygon)
+
+
+def test_polygons_are_the_tessellation_polygons():
+    for p, q in [(6, 4), (3, 7), (4, 5)]:
+        config = TessellationConfiguration(p, q)
+        graph = attach_polygons(TessellationGraph(config, num_layers=3))
+        tessellation = HyperbolicTessellation(config, max_polygon_count=20 * len(graph.vertices))
+
+        for vertex in graph.vertices:
+            assert any(same_vertices(vertex.polygon, polygon)
+                       for polygon in tessellation.tessellated_polygons)
+
+
+def test_edge_order_matches_polygon_sides():
+    for p, q in [(6, 4), (3, 7), (4, 5), (5, 5)]:
+        graph = attach_polygons(TessellationGraph(TessellationConfiguration(p, q), num_layers=4))
+        assert_shared_sides_match(graph, graph.layers)
+
+
+def test_streaming_windowed_graph():
+    graph = TessellationGraph(TessellationConfiguration(4, 5), num_layers=5, window=3)
+    for layer in iter_layers_with_polygons(graph):
+        assert all(vertex.polygon is not None for vertex in layer)
+        assert_shared_sides_match(graph, [layer])
+
+    with pytest.raises(ValueError):
+        next(iter_layers_with_polygons(
+            TessellationGraph(TessellationConfiguration(4, 5), num_layers=5, window=2)))
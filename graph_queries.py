@@ -0,0 +1,124 @@
+"""Graph distance queries on a CompactTessellationGraph.
+
+The distance between two vertices is the number of polygon edges crossed on a
+shortest path between the corresponding polygons. Note that a graph with a
+finite number of layers is a truncation of the full tessellation, so
+distances between vertices near the outermost layer may be larger than in the
+infinite tessellation, where a shorter path could leave the truncated region.
+
+All distances are returned as arrays indexed by vertex id, with UNREACHABLE
+for vertices that cannot be reached.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections import deque
+import heapq
+
+
+UNREACHABLE = -1
+
+
+def bfs_distances(graph, source):
+    """Return the distance from source to every vertex of the graph."""
+    return _bfs(graph, [source])
+
+
+def multi_source_distances(graph, sources):
+    """Return a list with one array of distances for each source."""
+    return [_bfs(graph, [source]) for source in sources]
+
+
+def nearest_source_distances(graph, sources):
+    """Return the distance from every vertex to the nearest of the sources,
+    computed with a single breadth-first search.
+    """
+    return _bfs(graph, sources)
+
+
+def distances_to_center(graph):
+    """Return the distance from every vertex to the center polygon.
+
+    This is not always the layer index: a vertex that only meets the previous
+    layer at a polygon vertex has no edge to that layer.
+    """
+    return _bfs(graph, [0])
+
+
+def _bfs(graph, sources):
+    offsets = graph.offsets
+    neighbors = graph.neighbors
+    distances = array('i', [UNREACHABLE]) * graph.num_vertices
+
+    queue = deque()
+    for source in sources:
+        if distances[source] == UNREACHABLE:
+            distances[source] = 0
+            queue.append(source)
+
+    while queue:
+        vertex = queue.popleft()
+        next_distance = distances[vertex] + 1
+        for i in range(offsets[vertex], offsets[vertex + 1]):
+            neighbor = neighbors[i]
+            if distances[neighbor] == UNREACHABLE:
+                distances[neighbor] = next_distance
+                queue.append(neighbor)
+
+    return distances
+
+
+def shortest_path(graph, source, target):
+    """Return a shortest path from source to target as a list of vertex ids,
+    or None if there is none.
+
+    Edges only join vertices in the same or adjacent layers, so the
+    difference in layer index between a vertex and the target is a lower
+    bound on their distance. This is used as an A* heuristic, which keeps the
+    search focused on the layers between source and target instead of
+    expanding a ball around the source.
+    """
+    layer_offsets = graph.layer_offsets
+    offsets = graph.offsets
+    neighbors = graph.neighbors
+
+    def layer_of(vertex):
+        return bisect_right(layer_offsets, vertex) - 1
+
+    target_layer = layer_of(target)
+
+    def lower_bound(vertex):
+        return abs(layer_of(vertex) - target_layer)
+
+    best = {source: 0}
+    parents = {source: None}
+    frontier = [(lower_bound(source), 0, source)]
+
+    while frontier:
+        _, distance, vertex = heapq.heappop(frontier)
+        if vertex == target:
+            path = []
+            while vertex is not None:
+                path.append(vertex)
+                vertex = parents[vertex]
+            return path[::-1]
+
+        if distance > best[vertex]:
+            continue
+
+        next_distance = distance + 1
+        for i in range(offsets[vertex], offsets[vertex + 1]):
+            neighbor = neighbors[i]
+            if next_distance < best.get(neighbor, next_distance + 1):
+                best[neighbor] = next_distance
+                parents[neighbor] = vertex
+                heapq.heappush(
+                    frontier, (next_distance + lower_bound(neighbor), next_distance, neighbor))
+
+    return None
+
+
+def distance(graph, source, target):
+    """Return the distance between two vertices, or UNREACHABLE."""
+    path = shortest_path(graph, source, target)
+    return UNREACHABLE if path is None else len(path) - 1
@@ -0,0 +1,45 @@
+from compact_graph import CompactTessellationGraph
+from graph_queries import *
+from tessellation import TessellationConfiguration
+
+
+def build(p, q, num_layers):
+    return CompactTessellationGraph.build(TessellationConfiguration(p, q), num_layers)
+
+
+def test_distances_to_center():
+    graph = build(6, 4, 3)
+    distances = distances_to_center(graph)
+    assert distances[0] == 0
+    # Layer 1 alternates between polygons sharing an edge and a vertex with
+    # the center.
+    assert [distances[v] for v in graph.layer_range(1)] == [1, 2] * 6
+    assert all(distances[v] >= 2 for v in graph.layer_range(2))
+
+
+def test_bfs_distances_are_symmetric():
+    graph = build(4, 5, 4)
+    a, b = graph.vertex_id(2, 3), graph.vertex_id(3, 100)
+    assert bfs_distances(graph, a)[b] == bfs_distances(graph, b)[a]
+
+
+def test_multi_source_and_nearest_source():
+    graph = build(3, 7, 4)
+    sources = [graph.vertex_id(1, 0), graph.vertex_id(2, 20)]
+    per_source = multi_source_distances(graph, sources)
+    nearest = nearest_source_distances(graph, sources)
+    assert len(per_source) == 2
+    for vertex in range(graph.num_vertices):
+        assert nearest[vertex] == min(d[vertex] for d in per_source)
+
+
+def test_shortest_path_agrees_with_bfs():
+    graph = build(5, 4, 4)
+    source = graph.vertex_id(1, 2)
+    distances = bfs_distances(graph, source)
+    for target in range(0, graph.num_vertices, 7):
+        path = shortest_path(graph, source, target)
+        assert path[0] == source and path[-1] == target
+        assert len(path) - 1 == distances[target] == distance(graph, source, target)
+        for v, w in zip(path, path[1:]):
+            assert w in graph.neighbors_of(v)
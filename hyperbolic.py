@@ -95,3 +95,27 @@ class PoincareDiskModel(Circle):
         else:
             circle = circle_through_points_perpendicular_to_circle(p1, p2, self)
             return PoincareDiskLine(circle.center, circle.radius)
+
+
+def compute_center_polygon(tessellation_configuration, disk_model):
+    """Compute the vertices of the polygon centered at the origin, in
+    counterclockwise order, by reflecting the fundamental triangle around the
+    origin.
+    """
+    center, top_vertex, x_axis_vertex = compute_fundamental_triangle(
+        tessellation_configuration)
+    p = tessellation_configuration.numPolygonSides
+
+    """The center polygon's first vertex is the top vertex (the one that
+    makes an angle of pi / q), because the x_axis_vertex is the center of
+    an edge.
+    """
+    polygon = [top_vertex]
+
+    p1, p2 = top_vertex, x_axis_vertex
+    for i in range(p - 1):
+        p2 = disk_model.line_through(center, p1).reflect(p2)
+        p1 = disk_model.line_through(center, p2).reflect(p1)
+        polygon.append(p1)
+
+    return polygon
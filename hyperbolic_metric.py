@@ -0,0 +1,169 @@
+"""Hyperbolic distances between points of the Poincare disk.
+
+The distance between two points u, v of the unit disk is
+
+    d(u, v) = arcosh(1 + 2 |u - v|^2 / ((1 - |u|^2)(1 - |v|^2)))
+
+Since arcosh is increasing, comparisons between distances (as in nearest
+neighbor queries) are done on the argument of arcosh, and the arcosh is only
+evaluated for the distances that are returned.
+
+The batch functions accept any sequence of (x, y) pairs, and return
+array('d') values so that large results stay compact. numpy is not a
+dependency of this package, so they are not vectorized: they still evaluate
+each distance in a Python loop, and only save the per-point work that can be
+shared (the conformal factors, and the arcosh in comparisons).
+"""
+
+from array import array
+from geometry import Point
+import heapq
+import math
+
+
+def _conformal_factor(x, y):
+    """Return 1 - |p|^2, raising a ValueError for points not in the open unit
+    disk, which are infinitely far from everything.
+    """
+    w = 1 - x * x - y * y
+    if w <= 0:
+        raise ValueError("Point ({}, {}) is not in the interior of the disk.".format(x, y))
+    return w
+
+
+def hyperbolic_distance(p1, p2):
+    """Compute the hyperbolic distance between two points of the disk."""
+    x1, y1 = p1
+    x2, y2 = p2
+    w = _conformal_factor(x1, y1) * _conformal_factor(x2, y2)
+    return math.acosh(1 + 2 * ((x1 - x2) ** 2 + (y1 - y2) ** 2) / w)
+
+
+class _PreparedPoints(object):
+    """Coordinates of a sequence of points, with their conformal factors
+    precomputed.
+    """
+
+    def __init__(self, points):
+        self.xs = array('d')
+        self.ys = array('d')
+        self.ws = array('d')
+        for x, y in points:
+            self.xs.append(x)
+            self.ys.append(y)
+            self.ws.append(_conformal_factor(x, y))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def arguments_from(self, x, y, w):
+        """Return the arcosh arguments of the distances from (x, y) to each
+        point, minus one (which keeps precision for nearby points; use
+        math.log1p to recover the distance).
+        """
+        return [
+            2 * ((x - x2) ** 2 + (y - y2) ** 2) / (w * w2)
+            for x2, y2, w2 in zip(self.xs, self.ys, self.ws)
+        ]
+
+
+def _distance_from_argument(a):
+    """arcosh(1 + a), computed stably for small a."""
+    return math.log1p(a + math.sqrt(a * (a + 2)))
+
+
+def distances(points1, points2):
+    """Return the distances between corresponding pairs of points of two
+    equal-length sequences.
+    """
+    points1 = list(points1)
+    points2 = list(points2)
+    if len(points1) != len(points2):
+        raise ValueError("Point sequences have different lengths: {} and {}".format(
+            len(points1), len(points2)))
+
+    result = array('d')
+    for (x1, y1), (x2, y2) in zip(points1, points2):
+        w = _conformal_factor(x1, y1) * _conformal_factor(x2, y2)
+        result.append(_distance_from_argument(2 * ((x1 - x2) ** 2 + (y1 - y2) ** 2) / w))
+    return result
+
+
+def iter_distance_matrix(points, others=None, chunk_size=1024):
+    """Yield (row_start, rows) pairs covering the matrix of distances from
+    each of points to each of others (or to each other, if others is None),
+    chunk_size rows at a time. Each row is an array('d').
+
+    Only one chunk is in memory at a time, so this can be used for inputs
+    whose full distance matrix does not fit in memory.
+    """
+    rows_prepared = _PreparedPoints(points)
+    columns_prepared = rows_prepared if others is None else _PreparedPoints(others)
+
+    for start in range(0, len(rows_prepared), chunk_size):
+        stop = min(start + chunk_size, len(rows_prepared))
+        rows = [
+            array('d', map(_distance_from_argument, columns_prepared.arguments_from(
+                rows_prepared.xs[i], rows_prepared.ys[i], rows_prepared.ws[i])))
+            for i in range(start, stop)
+        ]
+        yield start, rows
+
+
+def distance_matrix(points, others=None):
+    """Return the matrix of distances from each of points to each of others
+    (or to each other, if others is None), as a list of array('d') rows.
+    """
+    matrix = []
+    for _, rows in iter_distance_matrix(points, others):
+        matrix.extend(rows)
+    return matrix
+
+
+def nearest_neighbors(centers, queries, k=1):
+    """For each query point, return the k nearest of the centers as a list of
+    (index, distance) pairs, nearest first.
+    """
+    prepared = _PreparedPoints(centers)
+    if k > len(prepared):
+        raise ValueError("Asked for {} neighbors among {} points".format(k, len(prepared)))
+
+    results = []
+    for x, y in queries:
+        arguments = prepared.arguments_from(x, y, _conformal_factor(x, y))
+        if k == 1:
+            nearest = [min(range(len(arguments)), key=arguments.__getitem__)]
+        else:
+            nearest = heapq.nsmallest(k, range(len(arguments)), key=arguments.__getitem__)
+        results.append([(i, _distance_from_argument(arguments[i])) for i in nearest])
+    return results
+
+
+def polygon_center(polygon):
+    """Return the hyperbolic center of a regular polygon.
+
+    This is the Einstein midpoint of its vertices: the average of the
+    vertices in the Klein model, weighted by their Lorentz factors. The
+    Einstein midpoint commutes with isometries, so for a regular polygon it is
+    fixed by the rotations about the polygon's center, and hence is that
+    center.
+    """
+    total_x = total_y = total_weight = 0
+    for x, y in polygon:
+        # Map to the Klein model, where the Lorentz factor is
+        # 1 / sqrt(1 - |k|^2).
+        scale = 2 / (1 + x * x + y * y)
+        k_x, k_y = scale * x, scale * y
+        weight = 1 / math.sqrt(1 - k_x * k_x - k_y * k_y)
+        total_x += weight * k_x
+        total_y += weight * k_y
+        total_weight += weight
+
+    k_x, k_y = total_x / total_weight, total_y / total_weight
+    # Map back to the Poincare disk.
+    scale = 1 / (1 + math.sqrt(1 - k_x * k_x - k_y * k_y))
+    return Point(scale * k_x, scale * k_y)
+
+
+def polygon_centers(polygons):
+    return [polygon_center(polygon) for polygon in polygons]
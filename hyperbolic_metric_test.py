@@ -0,0 +1,62 @@
+import math
+import pytest
+
+from geometry import Point
+from hyperbolic_metric import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from testing import *
+
+
+def test_hyperbolic_distance_from_origin():
+    # The distance from the origin to a point at Euclidean radius r is
+    # 2 artanh(r).
+    assert_are_close(hyperbolic_distance(Point(0, 0), Point(0.5, 0)), 2 * math.atanh(0.5))
+    assert_are_close(hyperbolic_distance(Point(0, -0.9), Point(0, 0)), 2 * math.atanh(0.9))
+    assert hyperbolic_distance(Point(0.3, 0.2), Point(0.3, 0.2)) == 0
+
+
+def test_hyperbolic_distance_outside_disk():
+    with pytest.raises(ValueError):
+        hyperbolic_distance(Point(0, 0), Point(1, 0))
+
+
+def test_distances_match_scalar():
+    points1 = [Point(0.1, 0.2), Point(-0.5, 0.3), Point(0.7, -0.1)]
+    points2 = [Point(0.4, -0.2), Point(0.5, 0.3), Point(0.69, -0.1)]
+    for actual, p1, p2 in zip(distances(points1, points2), points1, points2):
+        assert_are_close(actual, hyperbolic_distance(p1, p2))
+    with pytest.raises(ValueError):
+        distances(points1, points2[:2])
+
+
+def test_distance_matrix_chunks():
+    points = [Point(0.1 * i, -0.05 * i) for i in range(9)]
+    others = [Point(0.2, 0.3), Point(-0.4, 0.1)]
+    matrix = distance_matrix(points, others)
+    assert len(matrix) == 9 and all(len(row) == 2 for row in matrix)
+    for i, point in enumerate(points):
+        for j, other in enumerate(others):
+            assert_are_close(matrix[i][j], hyperbolic_distance(point, other))
+
+    chunks = list(iter_distance_matrix(points, chunk_size=4))
+    assert [start for start, rows in chunks] == [0, 4, 8]
+    assert_are_close(chunks[1][1][0][2], hyperbolic_distance(points[4], points[2]))
+
+
+def test_nearest_neighbors():
+    centers = [Point(0, 0), Point(0.5, 0), Point(0, 0.5), Point(-0.8, 0)]
+    results = nearest_neighbors(centers, [Point(0.4, 0.05), Point(-0.6, 0)], k=2)
+    assert [i for i, _ in results[0]] == [1, 0]
+    assert [i for i, _ in results[1]] == [3, 0]
+    assert_are_close(results[0][0][1], hyperbolic_distance(Point(0.4, 0.05), centers[1]))
+
+
+def test_polygon_center():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(6, 4), max_polygon_count=30)
+    assert_are_close(polygon_center(tessellation.center_polygon), Point(0, 0))
+    for polygon in tessellation.tessellated_polygons:
+        center = polygon_center(polygon)
+        radii = [hyperbolic_distance(center, vertex) for vertex in polygon]
+        for radius in radii:
+            assert_are_close(radius, radii[0])
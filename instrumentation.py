@@ -0,0 +1,193 @@
+"""Opt-in instrumentation of the hot paths of a tessellation run.
+
+Instrumentation is off by default and then costs nothing beyond one None check
+per polygon dequeued in tessellate: counted functions are only wrapped while an
+`instrumented()` block is active, and the original methods are restored when it
+exits.
+
+    with instrumented() as stats:
+        tessellation = HyperbolicTessellation(config, max_polygon_count=5000)
+        tessellation.render('out.svg', canvas_width=500)
+    stats.dump_json(sys.stdout)
+
+or from the command line:
+
+    python instrumentation.py 6 4 --count 5000 --render out.svg
+
+The counters recorded are:
+
+ - line_through.diameter, line_through.arc: PoincareDiskModel.line_through
+   calls, split by whether the result is a diameter or a circle arc.
+ - invert_point: Circle.invert_point calls (which includes reflections in a
+   PoincareDiskLine).
+ - polygon_set.hit, polygon_set.miss: PolygonSet.contains_polygon results.
+
+Phase wall times are recorded for center_polygon, tessellate, render (building
+the drawing) and save (writing it to disk), and the length of the tessellate
+queue is sampled once per dequeued polygon.
+"""
+
+from array import array
+from collections import Counter
+from collections import defaultdict
+from contextlib import contextmanager
+import argparse
+import functools
+import json
+import sys
+import time
+
+
+_active = None
+
+
+def active():
+    """Return the active Instrumentation, or None if instrumentation is off."""
+    return _active
+
+
+class Instrumentation(object):
+    def __init__(self):
+        self.counters = Counter()
+        self.phase_seconds = defaultdict(float)
+        self.queue_lengths = array('L')
+
+    def increment(self, name, amount=1):
+        self.counters[name] += amount
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] += time.perf_counter() - start
+
+    def record_queue_length(self, length):
+        self.queue_lengths.append(length)
+
+    def as_dict(self):
+        return {
+            'counters': dict(self.counters),
+            'phase_seconds': dict(self.phase_seconds),
+            'queue_lengths': {
+                'samples': len(self.queue_lengths),
+                'max': max(self.queue_lengths, default=0),
+                'values': self.queue_lengths.tolist(),
+            },
+        }
+
+    def dump_json(self, fileobj, **kwargs):
+        json.dump(self.as_dict(), fileobj, **kwargs)
+
+
+def _counting_line_through(stats, line_through):
+    from hyperbolic import PoincareDiskLine
+
+    @functools.wraps(line_through)
+    def wrapper(*args, **kwargs):
+        line = line_through(*args, **kwargs)
+        if isinstance(line, PoincareDiskLine):
+            stats.increment('line_through.arc')
+        else:
+            stats.increment('line_through.diameter')
+        return line
+    return wrapper
+
+
+def _counting_invert_point(stats, invert_point):
+    @functools.wraps(invert_point)
+    def wrapper(*args, **kwargs):
+        stats.increment('invert_point')
+        return invert_point(*args, **kwargs)
+    return wrapper
+
+
+def _counting_contains_polygon(stats, contains_polygon):
+    @functools.wraps(contains_polygon)
+    def wrapper(*args, **kwargs):
+        contained = contains_polygon(*args, **kwargs)
+        stats.increment('polygon_set.hit' if contained else 'polygon_set.miss')
+        return contained
+    return wrapper
+
+
+def _timed(name):
+    def make_wrapper(stats, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with stats.phase(name):
+                return method(*args, **kwargs)
+        return wrapper
+    return make_wrapper
+
+
+@contextmanager
+def instrumented():
+    """Enable instrumentation for the duration of the block, yielding the
+    Instrumentation that collects the results.
+    """
+    global _active
+    if _active is not None:
+        raise ValueError("Instrumentation is already active.")
+
+    # Imported here because tessellation imports this module.
+    from geometry import Circle
+    from hyperbolic import PoincareDiskModel
+    from tessellation import HyperbolicTessellation
+    from tessellation import PolygonSet
+    import svgwrite
+
+    stats = Instrumentation()
+    patches = [
+        (PoincareDiskModel, 'line_through', _counting_line_through),
+        (Circle, 'invert_point', _counting_invert_point),
+        (PolygonSet, 'contains_polygon', _counting_contains_polygon),
+        (HyperbolicTessellation, 'compute_center_polygon', _timed('center_polygon')),
+        (HyperbolicTessellation, 'tessellate', _timed('tessellate')),
+        (HyperbolicTessellation, 'render_drawing', _timed('render')),
+        (svgwrite.Drawing, 'save', _timed('save')),
+    ]
+
+    originals = []
+    try:
+        for cls, attribute, make_wrapper in patches:
+            original = cls.__dict__[attribute]
+            originals.append((cls, attribute, original))
+            setattr(cls, attribute, make_wrapper(stats, original))
+        _active = stats
+        yield stats
+    finally:
+        _active = None
+        for cls, attribute, original in reversed(originals):
+            setattr(cls, attribute, original)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build a tessellation with instrumentation enabled and print the counters.")
+    parser.add_argument('p', type=int)
+    parser.add_argument('q', type=int)
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--render', default=None, help="also render to this svg file")
+    parser.add_argument('--canvas-width', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    from tessellation import HyperbolicTessellation
+    from tessellation import TessellationConfiguration
+
+    with instrumented() as stats:
+        tessellation = HyperbolicTessellation(
+            TessellationConfiguration(args.p, args.q), max_polygon_count=args.count)
+        if args.render:
+            tessellation.render(args.render, canvas_width=args.canvas_width)
+
+    stats.dump_json(sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == "__main__":
+    # Run through the imported module, whose state tessellate consults,
+    # rather than this __main__ copy.
+    import instrumentation
+    instrumentation.main()
@@ -0,0 +1,63 @@
+import io
+import json
+
+from geometry import Circle
+from hyperbolic import PoincareDiskModel
+from instrumentation import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+
+
+def test_instrumented_counts_hot_paths(tmpdir):
+    with instrumented() as stats:
+        tessellation = HyperbolicTessellation(TessellationConfiguration(6, 4), max_polygon_count=20)
+        tessellation.render(str(tmpdir.join('out.svg')), canvas_width=100)
+
+    counters = stats.counters
+    assert counters['line_through.diameter'] > 0
+    assert counters['line_through.arc'] > 0
+    assert counters['invert_point'] > 0
+    assert counters['polygon_set.miss'] == len(tessellation.tessellated_polygons)
+    assert counters['polygon_set.hit'] > 0
+    assert set(stats.phase_seconds) == {'center_polygon', 'tessellate', 'render', 'save'}
+    assert len(stats.queue_lengths) == counters['polygon_set.hit'] + counters['polygon_set.miss']
+
+
+def test_instrumented_counts_dequeues_with_memory_budget():
+    with instrumented() as stats:
+        tessellation = HyperbolicTessellation(
+            TessellationConfiguration(6, 4), max_polygon_count=200, memory_budget=10 ** 8)
+
+    counters = stats.counters
+    assert counters['polygon_set.miss'] == len(tessellation.tessellated_polygons)
+    assert len(stats.queue_lengths) == counters['polygon_set.hit'] + counters['polygon_set.miss']
+
+
+def test_instrumented_restores_original_methods():
+    line_through = PoincareDiskModel.line_through
+    invert_point = Circle.invert_point
+    with instrumented():
+        assert PoincareDiskModel.line_through is not line_through
+        assert active() is not None
+    assert PoincareDiskModel.line_through is line_through
+    assert Circle.invert_point is invert_point
+    assert active() is None
+
+
+def test_instrumented_is_not_reentrant():
+    with instrumented():
+        try:
+            with instrumented():
+                assert False
+        except ValueError:
+            pass
+
+
+def test_dump_json():
+    with instrumented() as stats:
+        HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=5)
+    output = io.StringIO()
+    stats.dump_json(output)
+    result = json.loads(output.getvalue())
+    assert result['queue_lengths']['samples'] > 0
+    assert 'tessellate' in result['phase_seconds']
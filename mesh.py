@@ -0,0 +1,139 @@
+"""An indexed mesh view of a set of polygons.
+
+The polygons of a tessellation each store their own copy of every vertex, so
+a vertex shared by q polygons is stored q times, each copy with slightly
+different floating point error. An IndexedMesh stores each vertex once and
+describes polygons by indices into the vertex table, so polygons sharing a
+vertex share it exactly, and each edge can be listed once.
+
+All tables are flat arrays:
+
+ - vertices: x0, y0, x1, y1, ... (typecode 'd')
+ - polygon_offsets: the vertex indices of polygon i are
+   polygon_vertices[polygon_offsets[i]:polygon_offsets[i + 1]]
+ - edges: u0, v0, u1, v1, ..., with u < v for each undirected edge
+"""
+
+from array import array
+from geometry import Point
+import math
+
+
+DEFAULT_TOLERANCE = 1e-7
+VERTEX_TYPECODE = 'i'
+OFFSET_TYPECODE = 'q'
+
+
+class VertexTable(object):
+    """Deduplicates points that are within tolerance of each other.
+
+    Points are bucketed into a grid of cells of width tolerance, so a point's
+    duplicates are in its own cell or one of the eight cells around it. The
+    first point seen is the one stored.
+    """
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.tolerance_squared = tolerance ** 2
+        self.cells = {}
+        self.coordinates = array('d')
+
+    def __len__(self):
+        return len(self.coordinates) // 2
+
+    def index_of(self, x, y):
+        """Return the index of the stored vertex within tolerance of (x, y),
+        adding (x, y) as a new vertex if there is none.
+        """
+        cell_x = math.floor(x / self.tolerance)
+        cell_y = math.floor(y / self.tolerance)
+        coordinates = self.coordinates
+        for dx in (0, -1, 1):
+            for dy in (0, -1, 1):
+                for index in self.cells.get((cell_x + dx, cell_y + dy), ()):
+                    offset_x = coordinates[2 * index] - x
+                    offset_y = coordinates[2 * index + 1] - y
+                    if offset_x * offset_x + offset_y * offset_y <= self.tolerance_squared:
+                        return index
+
+        index = len(self)
+        coordinates.append(x)
+        coordinates.append(y)
+        self.cells.setdefault((cell_x, cell_y), []).append(index)
+        return index
+
+
+class IndexedMesh(object):
+    def __init__(self, vertices, polygon_offsets, polygon_vertices, edges):
+        """Build a mesh from its flat tables; see the module docstring."""
+        self.vertices = vertices
+        self.polygon_offsets = polygon_offsets
+        self.polygon_vertices = polygon_vertices
+        self.edges = edges
+
+    @staticmethod
+    def from_polygons(polygons, tolerance=DEFAULT_TOLERANCE):
+        """Build a mesh from a sequence of polygons, each a list of points,
+        merging vertices that are within tolerance of each other.
+
+        The tolerance must be larger than the floating point error of the
+        polygons, and smaller than half the distance between distinct
+        vertices. The default suits tessellations of up to hundreds of
+        thousands of polygons.
+        """
+        table = VertexTable(tolerance)
+        polygon_offsets = array(OFFSET_TYPECODE, [0])
+        polygon_vertices = array(VERTEX_TYPECODE)
+        edges = array(VERTEX_TYPECODE)
+        seen_edges = set()
+
+        for polygon in polygons:
+            indices = [table.index_of(x, y) for (x, y) in polygon]
+            polygon_vertices.extend(indices)
+            polygon_offsets.append(len(polygon_vertices))
+
+            for u, v in zip(indices, indices[1:] + indices[:1]):
+                edge = (u, v) if u < v else (v, u)
+                if edge not in seen_edges:
+                    seen_edges.add(edge)
+                    edges.extend(edge)
+
+        return IndexedMesh(table.coordinates, polygon_offsets, polygon_vertices, edges)
+
+    @staticmethod
+    def from_tessellation(tessellation, tolerance=DEFAULT_TOLERANCE):
+        return IndexedMesh.from_polygons(tessellation.tessellated_polygons, tolerance=tolerance)
+
+    @property
+    def num_vertices(self):
+        return len(self.vertices) // 2
+
+    @property
+    def num_polygons(self):
+        return len(self.polygon_offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.edges) // 2
+
+    def vertex(self, index):
+        return Point(self.vertices[2 * index], self.vertices[2 * index + 1])
+
+    def polygon_indices(self, polygon_index):
+        """Return the vertex indices of a polygon."""
+        return self.polygon_vertices[
+            self.polygon_offsets[polygon_index]:self.polygon_offsets[polygon_index + 1]]
+
+    def polygon(self, polygon_index):
+        """Return the vertices of a polygon as Points."""
+        return [self.vertex(i) for i in self.polygon_indices(polygon_index)]
+
+    def edge(self, edge_index):
+        """Return the pair of vertex indices of an edge."""
+        return self.edges[2 * edge_index], self.edges[2 * edge_index + 1]
+
+    def iter_edge_points(self):
+        """Yield the endpoints of each edge as a pair of Points."""
+        for edge_index in range(self.num_edges):
+            u, v = self.edge(edge_index)
+            yield self.vertex(u), self.vertex(v)
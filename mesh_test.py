@@ -0,0 +1,58 @@
+from collections import Counter
+import pytest
+
+from geometry import Point
+from mesh import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from testing import *
+
+
+@pytest.mark.parametrize('p, q', [(4, 5), (3, 7), (7, 3)])
+def test_from_tessellation(p, q):
+    tessellation = HyperbolicTessellation(TessellationConfiguration(p, q), max_polygon_count=300)
+    polygons = tessellation.tessellated_polygons
+    mesh = IndexedMesh.from_tessellation(tessellation)
+
+    assert mesh.num_polygons == len(polygons)
+    distinct = set((round(x, 5), round(y, 5)) for polygon in polygons for (x, y) in polygon)
+    assert mesh.num_vertices == len(distinct)
+
+    for i, polygon in enumerate(polygons):
+        assert_iterables_are_close(mesh.polygon(i), polygon)
+        assert len(mesh.polygon_indices(i)) == p
+
+    # No vertex is shared by more than q polygons, and interior vertices are
+    # shared by exactly q.
+    polygons_per_vertex = Counter(mesh.polygon_vertices)
+    assert max(polygons_per_vertex.values()) == q
+
+    # Every side of every polygon is one edge, and an edge is a side of at
+    # most two polygons.
+    edges = set(mesh.edge(i) for i in range(mesh.num_edges))
+    assert len(edges) == mesh.num_edges
+    assert all(u < v for (u, v) in edges)
+    sides = Counter()
+    for i in range(mesh.num_polygons):
+        indices = list(mesh.polygon_indices(i))
+        for u, v in zip(indices, indices[1:] + indices[:1]):
+            sides[(min(u, v), max(u, v))] += 1
+    assert set(sides) == edges
+    assert max(sides.values()) == 2
+
+
+def test_vertices_within_tolerance_are_merged():
+    polygons = [
+        [Point(0, 0), Point(1, 0), Point(0, 1)],
+        [Point(1e-9, 1e-9), Point(0, 1 - 1e-9), Point(-1, 0)],
+    ]
+    mesh = IndexedMesh.from_polygons(polygons)
+    assert mesh.num_vertices == 4
+    assert list(mesh.polygon_indices(1)) == [0, 2, 3]
+    assert mesh.num_edges == 5
+    assert mesh.vertex(0) == Point(0, 0)
+    assert list(mesh.iter_edge_points())[0] == (Point(0, 0), Point(1, 0))
+
+    # Vertices on either side of a grid cell boundary are merged too.
+    mesh = IndexedMesh.from_polygons([[Point(1e-7 - 1e-12, 0)], [Point(1e-7 + 1e-12, 0)]])
+    assert mesh.num_vertices == 1
@@ -0,0 +1,179 @@
+"""Mobius and anti-Mobius transformations of the Poincare disk.
+
+Identifying the plane with the complex numbers, every isometry of the Poincare
+disk is either a Mobius transformation
+
+    z -> (a z + b) / (c z + d)
+
+or an anti-Mobius transformation, which is the same with z replaced by its
+complex conjugate. Rotations and hyperbolic translations are of the first
+kind, and reflections in a hyperbolic line are of the second.
+
+Representing isometries this way lets a chain of rotations and reflections be
+composed into a single transform once, then applied to many points at the cost
+of one complex division each.
+"""
+
+from geometry import Line
+from geometry import Point
+from geometry import VerticalLine
+from hyperbolic import PoincareDiskLine
+import cmath
+import math
+
+
+class MobiusTransform(object):
+    def __init__(self, a, b, c, d, conjugate=False):
+        """The transform z -> (a z + b) / (c z + d), applied to the conjugate
+        of z if conjugate is True.
+        """
+        a, b, c, d = complex(a), complex(b), complex(c), complex(d)
+        if abs(a * d - b * c) < 1e-15:
+            raise ValueError("Degenerate transform: ad - bc = 0")
+        self.a, self.b, self.c, self.d = a, b, c, d
+        self.conjugate = conjugate
+
+    @staticmethod
+    def identity():
+        return MobiusTransform(1, 0, 0, 1)
+
+    @staticmethod
+    def rotation(angle):
+        """Rotation about the origin by the given angle (in radians)."""
+        return MobiusTransform(cmath.exp(1j * angle), 0, 0, 1)
+
+    @staticmethod
+    def translation(point):
+        """The hyperbolic translation taking the origin to the given point
+        along the diameter through it: z -> (z + w) / (conj(w) z + 1).
+        """
+        w = complex(point[0], point[1])
+        if abs(w) >= 1:
+            raise ValueError("Point {} is not in the interior of the disk.".format(point))
+        return MobiusTransform(1, w, w.conjugate(), 1)
+
+    @staticmethod
+    def reflection(line):
+        """Reflection in a hyperbolic line: inversion in a PoincareDiskLine, or
+        Euclidean reflection in a Line (a diameter).
+        """
+        if isinstance(line, PoincareDiskLine):
+            """Inversion in the circle with center c and radius r is
+            z -> c + r^2 / conj(z - c), which as a function of conj(z) is
+            (c conj(z) + r^2 - |c|^2) / (conj(z) - conj(c)).
+            """
+            c = complex(line.center.x, line.center.y)
+            return MobiusTransform(
+                c, line.radius ** 2 - abs(c) ** 2, 1, -c.conjugate(), conjugate=True)
+
+        if isinstance(line, VerticalLine):
+            angle = math.pi / 2
+        elif isinstance(line, Line):
+            angle = math.atan(line.slope)
+        else:
+            raise TypeError("Can't reflect in {}".format(line))
+
+        """Reflection in the line through p with direction u = e^(i angle) is
+        z -> p + u^2 conj(z - p).
+        """
+        p = complex(line.point.x, line.point.y)
+        u_squared = cmath.exp(2j * angle)
+        return MobiusTransform(u_squared, p - u_squared * p.conjugate(), 0, 1, conjugate=True)
+
+    @property
+    def reverses_orientation(self):
+        return self.conjugate
+
+    def _apply_complex(self, z):
+        if self.conjugate:
+            z = z.conjugate()
+        return (self.a * z + self.b) / (self.c * z + self.d)
+
+    def __call__(self, point):
+        """Apply the transform to a single point."""
+        w = self._apply_complex(complex(point[0], point[1]))
+        return Point(w.real, w.imag)
+
+    def apply_to_points(self, points):
+        """Apply the transform to a sequence of points, returning a list of
+        Points.
+        """
+        a, b, c, d = self.a, self.b, self.c, self.d
+        if self.conjugate:
+            zs = (complex(x, -y) for x, y in points)
+        else:
+            zs = (complex(x, y) for x, y in points)
+
+        result = []
+        for z in zs:
+            w = (a * z + b) / (c * z + d)
+            result.append(Point(w.real, w.imag))
+        return result
+
+    def apply_to_polygons(self, polygons):
+        """Apply the transform to each of a sequence of polygons."""
+        return [self.apply_to_points(polygon) for polygon in polygons]
+
+    def compose(self, other):
+        """Return the transform that applies other, then self.
+
+        Conjugating the output of a Mobius transform M is the same as
+        applying the transform with conjugated coefficients to the conjugated
+        input, so if self conjugates its input, other's coefficients are
+        conjugated before multiplying the coefficient matrices.
+        """
+        a2, b2, c2, d2 = other.a, other.b, other.c, other.d
+        if self.conjugate:
+            a2, b2, c2, d2 = a2.conjugate(), b2.conjugate(), c2.conjugate(), d2.conjugate()
+
+        a1, b1, c1, d1 = self.a, self.b, self.c, self.d
+        return MobiusTransform(
+            a1 * a2 + b1 * c2,
+            a1 * b2 + b1 * d2,
+            c1 * a2 + d1 * c2,
+            c1 * b2 + d1 * d2,
+            conjugate=self.conjugate != other.conjugate,
+        ).normalized()
+
+    def __mul__(self, other):
+        return self.compose(other)
+
+    def inverse(self):
+        """Return the inverse transform.
+
+        If f(z) = M(conj(z)), then f^-1(w) = conj(M^-1(w)), which is the
+        transform with the conjugated coefficients of M^-1 applied to conj(w).
+        """
+        a, b, c, d = self.d, -self.b, -self.c, self.a
+        if self.conjugate:
+            a, b, c, d = a.conjugate(), b.conjugate(), c.conjugate(), d.conjugate()
+        return MobiusTransform(a, b, c, d, conjugate=self.conjugate).normalized()
+
+    def normalized(self):
+        """Return the same transform with coefficients scaled so that
+        ad - bc = 1, which keeps the coefficients of long compositions from
+        growing or shrinking without bound.
+        """
+        scale = cmath.sqrt(self.a * self.d - self.b * self.c)
+        return MobiusTransform(
+            self.a / scale, self.b / scale, self.c / scale, self.d / scale,
+            conjugate=self.conjugate)
+
+    def is_close_to(self, other, tolerance=1e-8):
+        """Whether two transforms are (numerically) the same map. Normalized
+        coefficients are only determined up to sign.
+        """
+        if self.conjugate != other.conjugate:
+            return False
+        mine = self.normalized()
+        theirs = other.normalized()
+        coefficients = [(mine.a, theirs.a), (mine.b, theirs.b), (mine.c, theirs.c), (mine.d, theirs.d)]
+        return (all(abs(x - y) < tolerance for x, y in coefficients)
+                or all(abs(x + y) < tolerance for x, y in coefficients))
+
+    def __str__(self):
+        return "MobiusTransform(a={}, b={}, c={}, d={}, conjugate={})".format(
+            self.a, self.b, self.c, self.d, self.conjugate)
+
+    def __repr__(self):
+        return str(self)
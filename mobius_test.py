@@ -0,0 +1,82 @@
+import math
+import pytest
+
+from geometry import Line
+from geometry import Point
+from geometry import VerticalLine
+from geometry import rotate_around_origin
+from hyperbolic import PoincareDiskLine
+from hyperbolic import PoincareDiskModel
+from mobius import *
+from testing import *
+
+
+POINTS = [Point(0.1, 0.2), Point(-0.5, 0.3), Point(0.7, -0.1), Point(0, 0)]
+
+
+def test_rotation():
+    rotation = MobiusTransform.rotation(math.pi / 5)
+    for point in POINTS:
+        assert_are_close(rotation(point), rotate_around_origin(math.pi / 5, point))
+
+
+def test_translation():
+    translation = MobiusTransform.translation(Point(0.3, -0.4))
+    assert_are_close(translation(Point(0, 0)), Point(0.3, -0.4))
+    assert_are_close(translation.inverse()(Point(0.3, -0.4)), Point(0, 0))
+    for image in translation.apply_to_points(POINTS):
+        assert image.norm() < 1
+    with pytest.raises(ValueError):
+        MobiusTransform.translation(Point(1, 0))
+
+
+def test_reflection_in_poincare_disk_line():
+    line = PoincareDiskModel(Point(0, 0), 1).line_through(Point(1/2, 1/2), Point(1/2, -1/2))
+    reflection = MobiusTransform.reflection(line)
+    assert reflection.reverses_orientation
+    for point in POINTS:
+        assert_are_close(reflection(point), line.reflect(point))
+
+
+def test_reflection_in_lines():
+    for line in [Line(Point(0, 0), 2), Line(Point(-1, -2), -1), VerticalLine.at_point(Point(0.3, 0))]:
+        reflection = MobiusTransform.reflection(line)
+        for point in POINTS:
+            assert_are_close(reflection(point), line.reflect(point))
+
+
+def test_composition_and_inverse():
+    line = PoincareDiskLine(Point(3/2, 0), (5/4) ** 0.5)
+    transforms = [
+        MobiusTransform.rotation(0.7),
+        MobiusTransform.reflection(line),
+        MobiusTransform.translation(Point(-0.2, 0.1)),
+        MobiusTransform.reflection(Line(Point(0, 0), 0.5)),
+    ]
+    composed = MobiusTransform.identity()
+    for transform in transforms:
+        composed = transform * composed
+    assert not composed.reverses_orientation
+
+    for point in POINTS:
+        expected = point
+        for transform in transforms:
+            expected = transform(expected)
+        assert_are_close(composed(point), expected)
+        assert_are_close(composed.inverse()(composed(point)), point)
+
+    assert (composed * composed.inverse()).is_close_to(MobiusTransform.identity())
+
+
+def test_apply_to_polygons():
+    rotation = MobiusTransform.rotation(math.pi)
+    polygons = rotation.apply_to_polygons([POINTS[:2], POINTS[2:]])
+    assert_iterables_are_close(polygons[0], [Point(-0.1, -0.2), Point(0.5, -0.3)])
+    assert len(polygons[1]) == 2
+
+
+def test_normalized():
+    transform = MobiusTransform(2, 0, 0, 2).normalized()
+    assert_are_close(abs(transform.a * transform.d - transform.b * transform.c), 1)
+    with pytest.raises(ValueError):
+        MobiusTransform(1, 1, 1, 1)
@@ -0,0 +1,144 @@
+"""Locate the polygon of a tessellation that contains a given point.
+
+Rather than searching through polygons, we fold the point back into the
+center polygon using the symmetries of the tessellation. The center polygon is
+divided into p wedges around the origin, one per side. If the point lies in
+the wedge of side k but beyond that side, then rotating the wedge onto the
+x-axis and reflecting across the side (which, after the rotation, is the side
+of the fundamental triangle through D) moves the point into a polygon one
+step closer to the center. Repeating until the point lies in the center
+polygon takes time proportional to the distance of the containing polygon
+from the center.
+
+The sequence of wedge indices used identifies the polygon as the image of the
+center polygon under the inverse sequence of symmetries, which we apply to the
+center polygon's vertices to recover the containing polygon.
+
+Different points of one polygon can fold along different paths, since each
+step only needs some side the point is beyond. To give each polygon a single
+word, the word of a point is reduced to a normal form: the word obtained by
+folding the center of its polygon, breaking ties between wedges (for centers
+on the boundary ray between two wedges) toward the higher index.
+"""
+
+from collections import namedtuple
+from geometry import EPSILON
+from geometry import Point
+from hyperbolic import PoincareDiskModel
+from hyperbolic import compute_center_polygon
+from hyperbolic import compute_fundamental_triangle
+from tessellation import PolygonSet
+import cmath
+import math
+
+
+# Folding a polygon's center treats wedge boundaries within this fraction of a
+# wedge as ties, so that rounding error can't change the chosen wedge.
+TIE_TOLERANCE = 1e-9
+
+
+class Location(namedtuple('Location', ['word', 'vertices', 'index'])):
+    """The polygon containing a point.
+
+    word: the normal form of the tuple of wedge indices that folds the point
+        into the center polygon; the empty tuple for the center polygon
+        itself. Every point of a polygon has the same word.
+    vertices: the vertices of the containing polygon.
+    index: the index of the polygon in the tessellation's
+        tessellated_polygons, or None if no tessellation was given or the
+        polygon is not part of it.
+    """
+
+
+class PointLocator(object):
+    def __init__(self, configuration, tessellation=None, max_steps=10000):
+        """Prepare to locate points in the tessellation with the given
+        configuration. If a HyperbolicTessellation is given, locations also
+        report the index of the containing polygon in it.
+        """
+        self.configuration = configuration
+        self.max_steps = max_steps
+        p = configuration.numPolygonSides
+        self.p = p
+        self.wedge_angle = 2 * math.pi / p
+        self.rotations = [cmath.exp(1j * k * self.wedge_angle) for k in range(p)]
+
+        disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+        _, top_vertex, x_axis_vertex = compute_fundamental_triangle(configuration)
+        side = disk_model.line_through(top_vertex, x_axis_vertex)
+        self.side_center = complex(side.center.x, side.center.y)
+        self.side_radius_squared = side.radius ** 2
+        self.center_polygon = [
+            complex(x, y) for (x, y) in compute_center_polygon(configuration, disk_model)
+        ]
+
+        self.polygon_index = None
+        if tessellation is not None:
+            self.keys = PolygonSet()
+            self.polygon_index = {
+                self.keys.polygon_key(polygon): i
+                for i, polygon in enumerate(tessellation.tessellated_polygons)
+            }
+
+    def _reflect_in_side(self, z):
+        """Invert z in the side of the center polygon crossing the positive
+        x-axis.
+        """
+        offset = z - self.side_center
+        return self.side_center + self.side_radius_squared / offset.conjugate()
+
+    def fold(self, point):
+        """Return a word of wedge indices that folds the point into the
+        center polygon. See normal_form for a word identifying the polygon.
+        """
+        z = complex(point[0], point[1])
+        if abs(z) >= 1:
+            raise ValueError("Point {} is not in the interior of the disk.".format(point))
+
+        word = []
+        for step in range(self.max_steps):
+            wedge = math.floor(cmath.phase(z) / self.wedge_angle + 0.5 + TIE_TOLERANCE) % self.p
+            rotated = z / self.rotations[wedge]
+            offset = rotated - self.side_center
+            distance_squared = offset.real ** 2 + offset.imag ** 2
+            if distance_squared >= self.side_radius_squared - EPSILON:
+                return tuple(word)
+            word.append(wedge)
+            z = self._reflect_in_side(rotated)
+
+        raise ValueError("Point {} did not fold into the center polygon in {} steps.".format(
+            point, self.max_steps))
+
+    def _unfold(self, z, word):
+        """Apply the inverse of the symmetries of a word to z."""
+        for wedge in reversed(word):
+            z = self.rotations[wedge] * self._reflect_in_side(z)
+        return z
+
+    def polygon_for_word(self, word):
+        """Return the vertices of the polygon identified by a word."""
+        vertices = []
+        for z in self.center_polygon:
+            z = self._unfold(z, word)
+            vertices.append(Point(z.real, z.imag))
+        return vertices
+
+    def normal_form(self, word):
+        """Return the canonical word of the polygon identified by a word: the
+        word folding the polygon's center, which is the image of the origin.
+        """
+        center = self._unfold(0j, word)
+        return self.fold((center.real, center.imag))
+
+    def locate(self, point):
+        """Return the Location of the polygon containing the point."""
+        word = self.normal_form(self.fold(point))
+        vertices = self.polygon_for_word(word)
+        index = None
+        if self.polygon_index is not None:
+            index = self.polygon_index.get(self.keys.polygon_key(vertices))
+        return Location(word=word, vertices=vertices, index=index)
+
+    def locate_many(self, points):
+        """Locate each of a sequence of (x, y) points."""
+        return [self.locate(point) for point in points]
@@ -0,0 +1,67 @@
+import math
+import pytest
+
+from geometry import Point
+from geometry import rotate_around_origin
+from point_location import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from testing import *
+
+
+def test_locate_center_polygon():
+    config = TessellationConfiguration(6, 4)
+    tessellation = HyperbolicTessellation(config, max_polygon_count=50)
+    location = PointLocator(config, tessellation).locate(Point(0.05, -0.1))
+    assert location.word == ()
+    assert location.index == 0
+    assert_iterables_are_close(location.vertices, tessellation.center_polygon)
+
+
+def test_locate_reflected_polygon():
+    config = TessellationConfiguration(4, 5)
+    locator = PointLocator(config)
+    # Just beyond the side of the center polygon crossing the positive x-axis.
+    center_side_x = locator.side_center.real - locator.side_radius_squared ** 0.5
+    location = locator.locate(Point(center_side_x + 0.05, 0))
+    assert location.word == (0,)
+
+    rotated = locator.locate(rotate_around_origin(math.pi / 2, Point(center_side_x + 0.05, 0)))
+    assert rotated.word == (1,)
+
+
+def test_located_polygons_are_tessellation_polygons():
+    for p, q in [(6, 4), (7, 3), (3, 7)]:
+        config = TessellationConfiguration(p, q)
+        tessellation = HyperbolicTessellation(config, max_polygon_count=1000)
+        locator = PointLocator(config, tessellation)
+        points = [
+            Point(r * math.cos(angle), r * math.sin(angle))
+            for r in [0.1, 0.3, 0.5, 0.6]
+            for angle in [0.1 * k for k in range(60)]
+        ]
+        for point, location in zip(points, locator.locate_many(points)):
+            assert location.index is not None
+            polygon = tessellation.tessellated_polygons[location.index]
+            for vertex in location.vertices:
+                assert any(is_close(vertex, other) for other in polygon)
+
+
+def test_locate_outside_disk():
+    with pytest.raises(ValueError):
+        PointLocator(TessellationConfiguration(6, 4)).locate(Point(1, 0))
+
+
+def test_points_of_one_polygon_get_the_same_word():
+    config = TessellationConfiguration(7, 3)
+    tessellation = HyperbolicTessellation(config, max_polygon_count=3000)
+    locator = PointLocator(config, tessellation)
+    for index, polygon in enumerate(tessellation.tessellated_polygons[:30]):
+        # Points between the centroid of the vertices and each vertex.
+        centroid = Point(sum(v.x for v in polygon) / len(polygon),
+                         sum(v.y for v in polygon) / len(polygon))
+        points = [centroid] + [centroid + (vertex - centroid) * 0.8 for vertex in polygon]
+        locations = locator.locate_many(points)
+        assert set(location.index for location in locations) == {index}
+        assert len(set(location.word for location in locations)) == 1
+        assert locator.normal_form(locations[0].word) == locations[0].word
@@ -0,0 +1,84 @@
+"""A list of polygons that can move its contents to disk.
+
+Polygons are appended in memory, and spill() writes all in-memory polygons to
+a new pickled chunk file in a temporary directory. The list can still be
+indexed, sliced and iterated as a whole; reading a spilled polygon loads its
+chunk, and the most recently loaded chunk is kept in memory so that
+sequential access reads each chunk once.
+"""
+
+import bisect
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+
+
+class SpilledPolygonList(object):
+    def __init__(self, directory=None):
+        """Store chunk files in a new temporary directory inside directory
+        (default: the system temporary directory). The files are deleted by
+        close(), or when the list is garbage collected.
+        """
+        self.directory = tempfile.mkdtemp(prefix='polygons-', dir=directory)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+        self.chunk_paths = []
+        # chunk_starts[i] is the index of the first polygon of chunk i.
+        self.chunk_starts = []
+        self.spilled_count = 0
+        self.in_memory = []
+        self._loaded_chunk_index = None
+        self._loaded_chunk = None
+
+    def __len__(self):
+        return self.spilled_count + len(self.in_memory)
+
+    def append(self, polygon):
+        self.in_memory.append(polygon)
+
+    def spill(self):
+        """Write the in-memory polygons to a new chunk file."""
+        if not self.in_memory:
+            return
+        path = os.path.join(self.directory, 'chunk-{}.pickle'.format(len(self.chunk_paths)))
+        with open(path, 'wb') as f:
+            pickle.dump(self.in_memory, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.chunk_paths.append(path)
+        self.chunk_starts.append(self.spilled_count)
+        self.spilled_count += len(self.in_memory)
+        self.in_memory = []
+
+    def _chunk(self, chunk_index):
+        if chunk_index != self._loaded_chunk_index:
+            with open(self.chunk_paths[chunk_index], 'rb') as f:
+                self._loaded_chunk = pickle.load(f)
+            self._loaded_chunk_index = chunk_index
+        return self._loaded_chunk
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("polygon index out of range")
+        if index >= self.spilled_count:
+            return self.in_memory[index - self.spilled_count]
+
+        chunk_index = bisect.bisect_right(self.chunk_starts, index) - 1
+        return self._chunk(chunk_index)[index - self.chunk_starts[chunk_index]]
+
+    def __iter__(self):
+        for chunk_index in range(len(self.chunk_paths)):
+            for polygon in self._chunk(chunk_index):
+                yield polygon
+        for polygon in list(self.in_memory):
+            yield polygon
+
+    def close(self):
+        """Delete the chunk files. Spilled polygons are no longer
+        accessible.
+        """
+        self._finalizer()
@@ -0,0 +1,43 @@
+import os
+import pytest
+
+from geometry import Point
+from polygon_store import *
+
+
+def polygons(count):
+    return [[Point(i, 0), Point(0, i), Point(i, i)] for i in range(count)]
+
+
+def test_spilled_polygon_list(tmpdir):
+    store = SpilledPolygonList(directory=str(tmpdir))
+    expected = polygons(10)
+    for i, polygon in enumerate(expected):
+        store.append(polygon)
+        if i in (2, 3, 7):
+            store.spill()
+
+    assert len(store) == 10
+    assert store.spilled_count == 8
+    assert len(store.chunk_paths) == 3
+    assert list(store) == expected
+    assert [store[i] for i in range(10)] == expected
+    assert store[-1] == expected[-1]
+    assert store[3:9] == expected[3:9]
+    with pytest.raises(IndexError):
+        store[10]
+
+    store.spill()
+    store.spill()
+    assert len(store.chunk_paths) == 4
+    assert list(store) == expected
+
+
+def test_close_removes_files(tmpdir):
+    store = SpilledPolygonList(directory=str(tmpdir))
+    store.append(polygons(1)[0])
+    store.spill()
+    assert os.path.exists(store.chunk_paths[0])
+
+    store.close()
+    assert not os.path.exists(store.directory)
@@ -0,0 +1,106 @@
+"""Sample the edges of a tessellation into polylines.
+
+Consumers that can't draw circle arcs (raster backends, GIS formats, plotting
+libraries) can draw each hyperbolic edge as a polyline instead. The edges are
+sampled in one batch into a single flat array of coordinates, with an offsets
+array marking where each edge's polyline starts:
+
+    the points of polyline i are
+    points[2 * offsets[i]:2 * offsets[i + 1]] = x0, y0, x1, y1, ...
+
+Points are in disk coordinates. The number of segments of each arc is chosen
+from its length once rendered on a canvas of a given width, so that the many
+tiny arcs near the boundary get a single segment, and long arcs near the
+center are smooth. Edges on diameters are straight and get one segment.
+"""
+
+from array import array
+from geometry import Point
+from hyperbolic import PoincareDiskLine
+from hyperbolic import PoincareDiskModel
+from mesh import IndexedMesh
+import cmath
+import math
+
+
+DEFAULT_SEGMENT_LENGTH = 4.0
+OFFSET_TYPECODE = 'q'
+
+
+class Polylines(object):
+    def __init__(self, points, offsets):
+        self.points = points
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_points(self):
+        return len(self.points) // 2
+
+    def polyline(self, index):
+        """Return the points of a polyline as a list of Points."""
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return [Point(self.points[2 * i], self.points[2 * i + 1]) for i in range(start, stop)]
+
+
+def segment_count(rendered_length, segment_length=DEFAULT_SEGMENT_LENGTH, max_segments=1024):
+    """The number of segments for an arc of the given rendered length, so
+    that each segment is at most segment_length long.
+    """
+    return max(1, min(max_segments, int(math.ceil(rendered_length / segment_length))))
+
+
+def sample_segments(segments, canvas_width, segment_length=DEFAULT_SEGMENT_LENGTH,
+                    disk_model=None):
+    """Sample the hyperbolic line segment between each pair of points of a
+    sequence into a polyline, and return them as Polylines.
+
+    canvas_width is the width of the canvas the disk would be rendered on, as
+    for HyperbolicTessellation.render, and segment_length the longest
+    rendered length of one polyline segment.
+    """
+    if disk_model is None:
+        disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+    # Disk lengths are scaled by this factor when rendered; see
+    # RenderedCoords.
+    scaling_factor = canvas_width / 2
+
+    points = array('d')
+    offsets = array(OFFSET_TYPECODE, [0])
+    for p1, p2 in segments:
+        line = disk_model.line_through(p1, p2)
+        if isinstance(line, PoincareDiskLine):
+            center = complex(line.center.x, line.center.y)
+            start = complex(p1[0], p1[1]) - center
+            # The edge is the minor arc, so the angle it subtends is the
+            # principal argument of the ratio of the endpoint offsets.
+            angle = cmath.phase((complex(p2[0], p2[1]) - center) / start)
+            count = segment_count(abs(angle) * line.radius * scaling_factor, segment_length)
+
+            step = cmath.exp(1j * angle / count)
+            offset = start
+            points.extend((p1[0], p1[1]))
+            for _ in range(count - 1):
+                offset *= step
+                points.extend(((center + offset).real, (center + offset).imag))
+            points.extend((p2[0], p2[1]))
+        else:
+            points.extend((p1[0], p1[1], p2[0], p2[1]))
+
+        offsets.append(len(points) // 2)
+
+    return Polylines(points, offsets)
+
+
+def sample_edges(tessellation, canvas_width, segment_length=DEFAULT_SEGMENT_LENGTH):
+    """Sample each edge of a tessellation once, in the order of the edges of
+    its IndexedMesh.
+    """
+    mesh = IndexedMesh.from_tessellation(tessellation)
+    return sample_segments(
+        mesh.iter_edge_points(),
+        canvas_width,
+        segment_length=segment_length,
+        disk_model=tessellation.disk_model)
@@ -0,0 +1,59 @@
+import math
+
+from geometry import Point
+from hyperbolic import PoincareDiskModel
+from mesh import IndexedMesh
+from polylines import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from testing import *
+
+
+def test_segment_count():
+    assert segment_count(0.1) == 1
+    assert segment_count(8.0, segment_length=4.0) == 2
+    assert segment_count(8.1, segment_length=4.0) == 3
+    assert segment_count(10 ** 9) == 1024
+
+
+def test_sample_arc():
+    disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+    p1, p2 = Point(1/2, 1/2), Point(1/2, -1/2)
+    line = disk_model.line_through(p1, p2)
+    polylines = sample_segments([(p1, p2)], canvas_width=1000, segment_length=10)
+
+    assert len(polylines) == 1
+    polyline = polylines.polyline(0)
+    assert_are_close(polyline[0], p1)
+    assert_are_close(polyline[-1], p2)
+
+    arc_length = line.radius * 2 * math.atan2(0.5, 1.5 - 0.5) * 500
+    assert len(polyline) == segment_count(arc_length, 10) + 1
+    for point in polyline:
+        assert_are_close((point - line.center).norm(), line.radius)
+        # The arc bulges toward the origin.
+        assert point.x <= 0.5 + 1e-12
+    for u, v in zip(polyline, polyline[1:]):
+        assert (u - v).norm() * 500 <= 10
+
+
+def test_sample_diameter():
+    polylines = sample_segments([(Point(0, 0), Point(0.3, 0.3))], canvas_width=1000)
+    assert polylines.polyline(0) == [Point(0, 0), Point(0.3, 0.3)]
+
+
+def test_sample_edges_adapts_to_length():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=300)
+    mesh = IndexedMesh.from_tessellation(tessellation)
+    polylines = sample_edges(tessellation, canvas_width=500)
+
+    assert len(polylines) == mesh.num_edges
+    assert polylines.offsets[-1] == polylines.num_points
+    counts = [polylines.offsets[i + 1] - polylines.offsets[i] for i in range(len(polylines))]
+    # Edges of the center polygon are long, edges near the boundary short.
+    assert max(counts) > 10
+    assert min(counts) == 2
+    for i, (u, v) in enumerate(mesh.iter_edge_points()):
+        polyline = polylines.polyline(i)
+        assert_are_close(polyline[0], u)
+        assert_are_close(polyline[-1], v)
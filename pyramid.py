@@ -0,0 +1,174 @@
+"""A multi-resolution store of the polygons of one tessellation.
+
+A pyramid is built from a single deep tessellation. Its polygons are stored
+in breadth-first order, tagged with their depth (the number of reflections
+from the center polygon) and their Euclidean size (the larger side of their
+bounding box, including curved sides). Since depth never decreases along the
+order, the polygons up to any depth are a prefix, and a viewer can serve any
+level of detail as a slice of the stored arrays instead of building a new
+tessellation.
+
+All data is in flat arrays, and save/load use binary_io, so a saved pyramid
+can be memory-mapped and only the requested prefix is read from disk.
+"""
+
+from array import array
+from binary_io import read_arrays
+from binary_io import write_arrays
+from geometry import Point
+from spatial_index import polygon_bounding_box
+from tessellation import HyperbolicTessellation
+from tessellation import RenderedCoords
+from tessellation import TessellationConfiguration
+import bisect
+
+
+MAGIC = b'HYPPYR01'
+DEFAULT_MIN_PIXEL_SIZE = 2.0
+
+
+class TessellationPyramid(object):
+    def __init__(self, configuration, coordinates, depths, sizes, depth_offsets, mapped=None):
+        """Build a pyramid from its arrays:
+
+        coordinates: x0, y0, x1, y1, ... of the vertices of each polygon in
+            turn, p vertices per polygon
+        depths: the depth of each polygon, in nondecreasing order
+        sizes: the Euclidean size of each polygon
+        depth_offsets: the polygons of depth d are those with indices
+            depth_offsets[d], ..., depth_offsets[d + 1] - 1
+        mapped: the MappedArrays backing the arrays, for loaded pyramids
+        """
+        self.configuration = configuration
+        self.num_sides = configuration.numPolygonSides
+        self.coordinates = coordinates
+        self.depths = depths
+        self.sizes = sizes
+        self.depth_offsets = depth_offsets
+        self.mapped = mapped
+
+    @staticmethod
+    def from_tessellation(tessellation):
+        """Build a pyramid from a HyperbolicTessellation computed by
+        tessellate (which records the polygon depths).
+        """
+        if tessellation.polygon_depths is None:
+            raise ValueError("The tessellation has no polygon depths")
+
+        coordinates = array('d')
+        sizes = array('d')
+        depth_offsets = array('q', [0])
+        for index, (polygon, depth) in enumerate(
+                zip(tessellation.tessellated_polygons, tessellation.polygon_depths)):
+            for point in polygon:
+                coordinates.extend(point)
+            min_x, min_y, max_x, max_y = polygon_bounding_box(polygon, tessellation.disk_model)
+            sizes.append(max(max_x - min_x, max_y - min_y))
+            while len(depth_offsets) <= depth:
+                depth_offsets.append(index)
+        depth_offsets.append(len(sizes))
+
+        return TessellationPyramid(
+            tessellation.configuration,
+            coordinates,
+            array('i', tessellation.polygon_depths),
+            sizes,
+            depth_offsets)
+
+    @staticmethod
+    def build(configuration, max_polygon_count=500, min_polygon_area=None):
+        return TessellationPyramid.from_tessellation(HyperbolicTessellation(
+            configuration,
+            max_polygon_count=max_polygon_count,
+            min_polygon_area=min_polygon_area))
+
+    def __len__(self):
+        return len(self.depths)
+
+    @property
+    def max_depth(self):
+        return len(self.depth_offsets) - 2
+
+    def polygon(self, index):
+        """Return the vertices of a polygon as Points."""
+        start = 2 * self.num_sides * index
+        coordinates = self.coordinates[start:start + 2 * self.num_sides]
+        return [Point(coordinates[i], coordinates[i + 1]) for i in range(0, len(coordinates), 2)]
+
+    def polygons(self, start=0, stop=None):
+        """Return the polygons with indices start, ..., stop - 1."""
+        if stop is None:
+            stop = len(self)
+        return [self.polygon(index) for index in range(start, stop)]
+
+    def level_stop(self, depth):
+        """Return the number of polygons of depth at most depth; the level of
+        detail of that depth is the prefix of that many polygons.
+        """
+        depth = min(depth, self.max_depth)
+        return self.depth_offsets[depth + 1] if depth >= 0 else 0
+
+    def level(self, depth):
+        """Return the polygons of depth at most depth."""
+        return self.polygons(0, self.level_stop(depth))
+
+    def depth_for_canvas(self, canvas_width, min_pixel_size=DEFAULT_MIN_PIXEL_SIZE):
+        """Return the deepest depth at which some polygon is at least
+        min_pixel_size pixels across when rendered on a canvas of the given
+        width. Deeper polygons would all be smaller than that.
+        """
+        min_size = min_pixel_size / RenderedCoords(canvas_width).in_rendered_coords(1)
+        depth = 0
+        for d in range(self.max_depth + 1):
+            start, stop = self.depth_offsets[d], self.depth_offsets[d + 1]
+            if start < stop and max(self.sizes[start:stop]) >= min_size:
+                depth = d
+        return depth
+
+    def for_canvas(self, canvas_width, min_pixel_size=DEFAULT_MIN_PIXEL_SIZE):
+        """Return the indices of the polygons to draw on a canvas of the given
+        width: those at most depth_for_canvas deep that are at least
+        min_pixel_size pixels across.
+        """
+        min_size = min_pixel_size / RenderedCoords(canvas_width).in_rendered_coords(1)
+        stop = self.level_stop(self.depth_for_canvas(canvas_width, min_pixel_size))
+        return [index for index in range(stop) if self.sizes[index] >= min_size]
+
+    def depth_of(self, index):
+        """Return the depth of a polygon, using the depth offsets."""
+        return bisect.bisect_right(self.depth_offsets, index) - 1
+
+    def save(self, path):
+        write_arrays(
+            path,
+            MAGIC,
+            {
+                'p': self.configuration.numPolygonSides,
+                'q': self.configuration.numPolygonsPerVertex,
+            },
+            [
+                ('coordinates', self.coordinates),
+                ('depths', self.depths),
+                ('sizes', self.sizes),
+                ('depth_offsets', self.depth_offsets),
+            ])
+
+    @staticmethod
+    def load(path):
+        """Memory-map a pyramid written by save. Call close() when done with
+        it.
+        """
+        mapped = read_arrays(path, MAGIC)
+        configuration = TessellationConfiguration(mapped.metadata['p'], mapped.metadata['q'])
+        return TessellationPyramid(
+            configuration,
+            mapped.arrays['coordinates'],
+            mapped.arrays['depths'],
+            mapped.arrays['sizes'],
+            mapped.arrays['depth_offsets'],
+            mapped=mapped)
+
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
@@ -0,0 +1,80 @@
+import pytest
+
+from pyramid import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from testing import *
+
+
+@pytest.fixture(scope='module')
+def tessellation():
+    return HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=400)
+
+
+def test_levels_are_prefixes(tessellation):
+    pyramid = TessellationPyramid.from_tessellation(tessellation)
+    polygons = tessellation.tessellated_polygons
+    assert len(pyramid) == len(polygons)
+    assert pyramid.max_depth == max(tessellation.polygon_depths)
+
+    assert pyramid.level(0) == [tessellation.center_polygon]
+    for depth in range(pyramid.max_depth + 1):
+        level = pyramid.level(depth)
+        assert level == polygons[:len(level)]
+        assert all(pyramid.depth_of(i) == depth for i in range(
+            pyramid.depth_offsets[depth], pyramid.depth_offsets[depth + 1]))
+        assert all(tessellation.polygon_depths[i] <= depth for i in range(len(level)))
+    assert len(pyramid.level(pyramid.max_depth + 5)) == len(polygons)
+
+
+def test_sizes_decrease_with_depth(tessellation):
+    pyramid = TessellationPyramid.from_tessellation(tessellation)
+    largest = [
+        max(pyramid.sizes[pyramid.depth_offsets[d]:pyramid.depth_offsets[d + 1]])
+        for d in range(pyramid.max_depth + 1)
+    ]
+    # Polygons of the first layers can be exactly as large as the center
+    # one, up to rounding.
+    assert all(b <= a + 1e-12 for a, b in zip(largest, largest[1:]))
+
+
+def test_canvas_level_of_detail(tessellation):
+    pyramid = TessellationPyramid.from_tessellation(tessellation)
+    small = pyramid.depth_for_canvas(50, min_pixel_size=4)
+    large = pyramid.depth_for_canvas(5000, min_pixel_size=4)
+    assert small < large
+    assert pyramid.depth_for_canvas(50, min_pixel_size=1000) == 0
+
+    selected = pyramid.for_canvas(500, min_pixel_size=4)
+    assert selected[0] == 0
+    assert all(pyramid.sizes[i] * 250 >= 4 for i in selected)
+    assert len(selected) < len(pyramid)
+
+
+def test_save_and_load(tessellation, tmpdir):
+    pyramid = TessellationPyramid.from_tessellation(tessellation)
+    path = str(tmpdir.join('pyramid.bin'))
+    pyramid.save(path)
+
+    loaded = TessellationPyramid.load(path)
+    assert loaded.configuration == tessellation.configuration
+    assert len(loaded) == len(pyramid)
+    assert loaded.polygons() == pyramid.polygons()
+    assert list(loaded.depths) == list(pyramid.depths)
+    assert list(loaded.depth_offsets) == list(pyramid.depth_offsets)
+    assert loaded.for_canvas(500) == pyramid.for_canvas(500)
+
+    # Closing is safe while slices of the mapped arrays are alive, and
+    # idempotent.
+    held = loaded.sizes[:3]
+    loaded.close()
+    loaded.close()
+    assert list(held) == list(pyramid.sizes[:3])
+
+
+def test_requires_depths():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=10)
+    wrapped = HyperbolicTessellation.from_polygons(
+        tessellation.configuration, tessellation.tessellated_polygons)
+    with pytest.raises(ValueError):
+        TessellationPyramid.from_tessellation(wrapped)
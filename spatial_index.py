@@ -0,0 +1,182 @@
+"""A bulk-loaded spatial index over the Euclidean bounding boxes of polygons.
+
+The index is a packed R-tree: boxes are sorted once along a Hilbert curve and
+grouped into nodes of node_size consecutive entries, level by level, so that
+it is built in O(n log n) time and answers rectangle and disk queries by
+descending only into nodes whose box meets the query region.
+
+Note that the bounding box of a hyperbolic polygon is not the bounding box of
+its vertices: sides are circle arcs, and the side of a polygon facing the
+origin bulges outward past its endpoints. polygon_bounding_box accounts for
+this.
+"""
+
+from array import array
+from geometry import Point
+from hyperbolic import PoincareDiskLine
+from hyperbolic import PoincareDiskModel
+
+
+HILBERT_ORDER = 16
+
+
+def arc_bounding_box(line, p1, p2):
+    """Return the bounding box (min_x, min_y, max_x, max_y) of the segment of
+    a hyperbolic line between two points.
+
+    For a PoincareDiskLine the segment is the minor arc from p1 to p2, which
+    extends past its endpoints if it contains the leftmost, rightmost, top or
+    bottom point of its circle. A point w of the circle lies on the minor arc
+    if it is on the other side of the chord p1 p2 from the circle's center.
+    """
+    xs = [p1.x, p2.x]
+    ys = [p1.y, p2.y]
+    if isinstance(line, PoincareDiskLine):
+        c, r = line.center, line.radius
+        chord_x, chord_y = p2.x - p1.x, p2.y - p1.y
+        center_side = chord_x * (c.y - p1.y) - chord_y * (c.x - p1.x)
+        for w_x, w_y in [(c.x + r, c.y), (c.x - r, c.y), (c.x, c.y + r), (c.x, c.y - r)]:
+            if center_side * (chord_x * (w_y - p1.y) - chord_y * (w_x - p1.x)) < 0:
+                xs.append(w_x)
+                ys.append(w_y)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def polygon_bounding_box(polygon, disk_model=None):
+    """Return the bounding box (min_x, min_y, max_x, max_y) of a hyperbolic
+    polygon, including the parts of its sides that bulge past its vertices.
+    """
+    if disk_model is None:
+        disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+
+    boxes = [
+        arc_bounding_box(disk_model.line_through(u, v), u, v)
+        for u, v in zip(polygon, polygon[1:] + polygon[:1])
+    ]
+    return (
+        min(b[0] for b in boxes),
+        min(b[1] for b in boxes),
+        max(b[2] for b in boxes),
+        max(b[3] for b in boxes),
+    )
+
+
+def hilbert_index(x, y, order=HILBERT_ORDER):
+    """Return the distance along a Hilbert curve of the cell (x, y) of a
+    2^order by 2^order grid.
+    """
+    index = 0
+    s = 1 << (order - 1)
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        index += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x = s - 1 - x
+                y = s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return index
+
+
+def boxes_intersect(box, min_x, min_y, max_x, max_y):
+    return not (box[0] > max_x or box[2] < min_x or box[1] > max_y or box[3] < min_y)
+
+
+class PackedRTree(object):
+    def __init__(self, boxes, node_size=16):
+        """Build the index over a sequence of (min_x, min_y, max_x, max_y)
+        boxes. Queries return indices into this sequence.
+        """
+        if node_size < 2:
+            raise ValueError("node_size must be at least 2")
+        self.node_size = node_size
+        self.num_items = len(boxes)
+
+        if not boxes:
+            self.items = array('l')
+            self.levels = []
+            return
+
+        min_x = min(b[0] for b in boxes)
+        min_y = min(b[1] for b in boxes)
+        width = max(b[2] for b in boxes) - min_x or 1.0
+        height = max(b[3] for b in boxes) - min_y or 1.0
+        grid_max = (1 << HILBERT_ORDER) - 1
+
+        def sort_key(i):
+            b = boxes[i]
+            x = int(grid_max * ((b[0] + b[2]) / 2 - min_x) / width)
+            y = int(grid_max * ((b[1] + b[3]) / 2 - min_y) / height)
+            return hilbert_index(x, y)
+
+        # Leaf entries in Hilbert order. items maps a leaf entry to its index
+        # in the input.
+        self.items = array('l', sorted(range(len(boxes)), key=sort_key))
+        level = array('d')
+        for i in self.items:
+            level.extend(boxes[i])
+
+        # levels[0] holds the item boxes; node j of levels[k + 1] covers
+        # entries j * node_size, ..., (j + 1) * node_size - 1 of levels[k].
+        self.levels = [level]
+        while len(level) > 4:
+            parent = array('d')
+            for start in range(0, len(level), 4 * node_size):
+                children = level[start:start + 4 * node_size]
+                parent.extend((
+                    min(children[0::4]),
+                    min(children[1::4]),
+                    max(children[2::4]),
+                    max(children[3::4]),
+                ))
+            self.levels.append(parent)
+            level = parent
+
+    def __len__(self):
+        return self.num_items
+
+    def _search(self, test):
+        """Return the sorted indices of the items whose boxes pass test,
+        descending only into nodes whose boxes pass it too.
+        """
+        if not self.levels:
+            return []
+
+        results = []
+        stack = [(len(self.levels), 0)]
+        while stack:
+            level_index, node = stack.pop()
+            child_level = self.levels[level_index - 1]
+            first = node * self.node_size
+            last = min(first + self.node_size, len(child_level) // 4)
+            for child in range(first, last):
+                if test(child_level[4 * child:4 * child + 4]):
+                    if level_index == 1:
+                        results.append(self.items[child])
+                    else:
+                        stack.append((level_index - 1, child))
+
+        # Entries were found in tree order, not input order.
+        results.sort()
+        return results
+
+    def query_rectangle(self, min_x, min_y, max_x, max_y):
+        """Return the sorted indices of the boxes intersecting a rectangle."""
+        def test(box):
+            return boxes_intersect(box, min_x, min_y, max_x, max_y)
+        return self._search(test)
+
+    def query_disk(self, center, radius):
+        """Return the sorted indices of the boxes intersecting a Euclidean
+        disk.
+        """
+        c_x, c_y = center
+        radius_squared = radius ** 2
+
+        def test(box):
+            dx = max(box[0] - c_x, 0, c_x - box[2])
+            dy = max(box[1] - c_y, 0, c_y - box[3])
+            return dx * dx + dy * dy <= radius_squared
+        return self._search(test)
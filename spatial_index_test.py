@@ -0,0 +1,65 @@
+import math
+import random
+
+from geometry import Point
+from hyperbolic import PoincareDiskModel
+from spatial_index import *
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+
+
+def brute_force_rectangle(boxes, min_x, min_y, max_x, max_y):
+    return [i for i, box in enumerate(boxes) if boxes_intersect(box, min_x, min_y, max_x, max_y)]
+
+
+def test_arc_bounding_box_includes_bulge():
+    model = PoincareDiskModel(Point(0, 0), radius=1)
+    p1, p2 = Point(1/2, 1/2), Point(1/2, -1/2)
+    line = model.line_through(p1, p2)
+    min_x, min_y, max_x, max_y = arc_bounding_box(line, p1, p2)
+    # The arc crosses the x-axis at 3/2 - sqrt(5/4), left of its endpoints.
+    assert abs(min_x - (1.5 - (5 / 4) ** 0.5)) < 1e-9
+    assert (min_y, max_x, max_y) == (-1/2, 1/2, 1/2)
+
+
+def test_arc_bounding_box_diameter():
+    model = PoincareDiskModel(Point(0, 0), radius=1)
+    p1, p2 = Point(-0.5, -0.25), Point(0.5, 0.25)
+    assert arc_bounding_box(model.line_through(p1, p2), p1, p2) == (-0.5, -0.25, 0.5, 0.25)
+
+
+def test_packed_rtree_matches_brute_force():
+    random.seed(0)
+    boxes = []
+    for i in range(1000):
+        x, y = random.uniform(-1, 1), random.uniform(-1, 1)
+        w, h = random.uniform(0, 0.05), random.uniform(0, 0.05)
+        boxes.append((x, y, x + w, y + h))
+    tree = PackedRTree(boxes, node_size=8)
+    assert len(tree) == 1000
+
+    for i in range(50):
+        x, y = random.uniform(-1, 1), random.uniform(-1, 1)
+        query = (x, y, x + random.uniform(0, 0.5), y + random.uniform(0, 0.5))
+        assert tree.query_rectangle(*query) == brute_force_rectangle(boxes, *query)
+
+        radius = random.uniform(0, 0.3)
+        expected = [
+            i for i, (min_x, min_y, max_x, max_y) in enumerate(boxes)
+            if math.hypot(max(min_x - x, 0, x - max_x), max(min_y - y, 0, y - max_y)) <= radius
+        ]
+        assert tree.query_disk((x, y), radius) == expected
+
+
+def test_packed_rtree_small_inputs():
+    assert PackedRTree([]).query_rectangle(-1, -1, 1, 1) == []
+    assert PackedRTree([(0, 0, 1, 1)]).query_disk(Point(2, 0.5), 1) == [0]
+
+
+def test_tessellation_spatial_index():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(6, 4), max_polygon_count=300)
+    tree = tessellation.build_spatial_index()
+    assert tessellation.spatial_index is tree
+    boxes = tessellation.polygon_bounding_boxes()
+    assert tree.query_rectangle(0.2, 0.2, 0.5, 0.4) == brute_force_rectangle(boxes, 0.2, 0.2, 0.5, 0.4)
+    assert 0 in tree.query_disk(Point(0, 0), 0.01)
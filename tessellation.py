@@ -2,6 +2,7 @@
 Poincare disk by uniform, regular polygons.
 """
 
+from array import array
 from collections import deque
 from collections import namedtuple
 from geometry import Point
@@ -9,8 +10,25 @@ from geometry import bounding_box_area
 from geometry import orientation
 from hyperbolic import PoincareDiskLine
 from hyperbolic import PoincareDiskModel
-from hyperbolic import compute_fundamental_triangle
+from hyperbolic import compute_center_polygon
+from hyperbolic_metric import polygon_centers
+from mesh import IndexedMesh
+from mesh import VertexTable
+from mobius import MobiusTransform
+from multiprocessing import Pool
+from polygon_store import SpilledPolygonList
+from spatial_index import PackedRTree
+from spatial_index import polygon_bounding_box
+import instrumentation
+import io
+import logging
+import math
+import os
 import svgwrite
+import sys
+
+
+logger = logging.getLogger(__name__)
 
 
 class TessellationConfiguration(
@@ -45,6 +63,13 @@ class PolygonSet(set):
             for p in points
         )
 
+    def polygon_key(self, points):
+        """Return the canonical key of a polygon, under which it is stored
+        in the set. Two lists of points have the same key when they are the
+        same polygon, up to the order of the vertices and rounding.
+        """
+        return self._canonicalize(points)
+
     def add_polygon(self, points):
         self.add(self._canonicalize(points))
 
@@ -52,6 +77,68 @@ class PolygonSet(set):
         return self._canonicalize(points) in self
 
 
+class DepthBandPolygonSet(PolygonSet):
+    """A PolygonSet that remembers the breadth-first depth at which each
+    polygon was added, so that polygons too shallow to be seen again can be
+    forgotten with prune.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.keys_by_depth = {}
+        self.min_depth = 0
+
+    def add_polygon(self, points, depth=0):
+        key = self._canonicalize(points)
+        if key not in self:
+            self.add(key)
+            self.keys_by_depth.setdefault(depth, []).append(key)
+
+    def prune(self, min_depth):
+        """Forget the polygons added at depths below min_depth."""
+        while self.min_depth < min_depth:
+            for key in self.keys_by_depth.pop(self.min_depth, []):
+                self.discard(key)
+            self.min_depth += 1
+
+
+class MemoryEstimate(object):
+    """Estimates of the memory held by tessellate's data structures, based on
+    the sizes of the objects representing one polygon with the given number
+    of sides.
+    """
+
+    def __init__(self, num_sides):
+        point_bytes = sys.getsizeof(Point(0.5, 0.5)) + 2 * sys.getsizeof(0.5)
+        # A polygon is a list of points, and a queue entry pairs it with a
+        # depth.
+        self.polygon_bytes = sys.getsizeof([None] * num_sides) + num_sides * point_bytes
+        self.queue_entry_bytes = self.polygon_bytes + sys.getsizeof((None, 0))
+        # A canonicalized polygon is a frozenset of points, plus its slot in
+        # the set's hash table and the list of keys by depth.
+        self.key_bytes = (sys.getsizeof(frozenset(range(num_sides))) + num_sides * point_bytes
+                          + 3 * 8)
+
+    def in_memory_bytes(self, queue_length, processed_count, output_count):
+        """The total estimate, and the part of it that can't be spilled to
+        disk.
+        """
+        fixed = queue_length * self.queue_entry_bytes + processed_count * self.key_bytes
+        return fixed + output_count * self.polygon_bytes, fixed
+
+
+def _max_rss_kb():
+    """The peak resident set size of this process, or None on platforms
+    without the resource module.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
 class RenderedCoords:
     """A helper class to keep track of a transformation from the unit circle to
     a rendered image.
@@ -77,67 +164,246 @@ class HyperbolicTessellation(object):
     arcs of circles perpendicular to the boundary of the disk.
     """
 
-    def __init__(self, configuration, max_polygon_count=500):
+    def __init__(self, configuration, max_polygon_count=500, min_polygon_area=None,
+                 memory_budget=None):
         self.configuration = configuration
         self.disk_model = PoincareDiskModel(Point(0, 0), radius=1)
 
         # compute the vertices of the center polygon via reflection
         self.center_polygon = self.compute_center_polygon()
-        self.tessellated_polygons = self.tessellate(max_polygon_count=max_polygon_count)
-
-    def compute_center_polygon(self):
-        center, top_vertex, x_axis_vertex = compute_fundamental_triangle(
-            self.configuration)
-        p = self.configuration.numPolygonSides
-
-        """The center polygon's first vertex is the top vertex (the one that
-        makes an angle of pi / q), because the x_axis_vertex is the center of
-        an edge.
+        self.tessellated_polygons = self.tessellate(
+            max_polygon_count=max_polygon_count,
+            min_polygon_area=min_polygon_area,
+            memory_budget=memory_budget)
+
+    @staticmethod
+    def from_polygons(configuration, polygons, center_polygon=None):
+        """Build a tessellation from already computed polygons, without
+        running tessellate. center_polygon defaults to the first polygon.
+        """
+        tessellation = HyperbolicTessellation.__new__(HyperbolicTessellation)
+        tessellation.configuration = configuration
+        tessellation.disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+        tessellation.center_polygon = polygons[0] if center_polygon is None else center_polygon
+        tessellation.tessellated_polygons = polygons
+        tessellation.polygon_depths = None
+        tessellation.memory_report = None
+        return tessellation
+
+    def dual(self):
+        """Return the dual {q, p} tessellation, whose vertices are the centers
+        of this tessellation's polygons.
+
+        Each vertex shared by q of the tessellated polygons becomes the center
+        of a dual polygon with those polygons' centers as its vertices.
+        Vertices on the rim of the tessellated region, shared by fewer than q
+        polygons, have no dual polygon. The dual polygons' vertices are in
+        counterclockwise order.
+
+        The first dual polygon surrounds a vertex of the center polygon. Like
+        every tessellation, the dual is positioned so that its center polygon
+        is the one computed by compute_center_polygon: the dual polygons are
+        moved by the isometry taking that vertex to the origin, and rotating
+        the first dual polygon onto the standard {q, p} center polygon.
         """
-        polygon = [top_vertex]
+        p = self.configuration.numPolygonSides
+        q = self.configuration.numPolygonsPerVertex
+        mesh = IndexedMesh.from_polygons(self.tessellated_polygons)
+        centers = polygon_centers(self.tessellated_polygons)
+
+        polygons_at_vertex = [[] for _ in range(mesh.num_vertices)]
+        for polygon_index in range(mesh.num_polygons):
+            for vertex_index in mesh.polygon_indices(polygon_index):
+                polygons_at_vertex[vertex_index].append(polygon_index)
+
+        dual_polygons = []
+        dual_centers = []
+        for vertex_index, polygon_indices in enumerate(polygons_at_vertex):
+            if len(polygon_indices) != q:
+                continue
 
-        p1, p2 = top_vertex, x_axis_vertex
-        for i in range(p - 1):
-            p2 = self.disk_model.line_through(center, p1).reflect(p2)
-            p1 = self.disk_model.line_through(center, p2).reflect(p1)
-            polygon.append(p1)
+            """Order the centers by the direction of the geodesic to them from
+            the vertex. Moving the vertex to the origin makes those geodesics
+            diameters, so the direction is the Euclidean angle.
+            """
+            to_origin = MobiusTransform.translation(mesh.vertex(vertex_index)).inverse()
+            dual_polygon = [centers[i] for i in polygon_indices]
+            angles = [math.atan2(y, x) for (x, y) in to_origin.apply_to_points(dual_polygon)]
+            dual_polygons.append([
+                dual_polygon[i] for i in sorted(range(q), key=angles.__getitem__)])
+            dual_centers.append(mesh.vertex(vertex_index))
+
+        if not dual_polygons:
+            raise ValueError("No vertex is surrounded by tessellated polygons")
+
+        configuration = TessellationConfiguration(q, p)
+        center_polygon = compute_center_polygon(configuration, self.disk_model)
+        to_origin = MobiusTransform.translation(dual_centers[0]).inverse()
+        first_vertex = to_origin(dual_polygons[0][0])
+        rotation = MobiusTransform.rotation(
+            math.atan2(center_polygon[0].y, center_polygon[0].x)
+            - math.atan2(first_vertex.y, first_vertex.x))
+        dual_polygons = rotation.compose(to_origin).apply_to_polygons(dual_polygons)
+        dual_polygons[0] = center_polygon
+
+        return HyperbolicTessellation.from_polygons(configuration, dual_polygons)
 
-        return polygon
+    def compute_center_polygon(self):
+        return compute_center_polygon(self.configuration, self.disk_model)
 
-    def tessellate(self, max_polygon_count=500):
+    def tessellate(self, max_polygon_count=500, min_polygon_area=None, memory_budget=None):
         """Return the set of polygons that make up a tessellation of the center
-        polygon. Keep reflecting polygons until the Euclidean bounding box of all
-        polygons is less than the given threshold.
+        polygon. Keep reflecting polygons until max_polygon_count polygons have
+        been produced, or, if min_polygon_area is given, until the Euclidean
+        bounding box of every remaining polygon is less than that threshold.
+
+        The breadth-first depth of each polygon (the number of reflections
+        from the center polygon) is stored in self.polygon_depths.
+
+        If memory_budget is given, the estimated size in bytes of the
+        tessellation's working state is kept at or below it:
+
+        - Polygons are only checked for duplicates against the polygons at
+          most two layers shallower, since a reflection moves a polygon by at
+          most one layer. Older polygons are forgotten.
+        - Before each polygon is processed, the usage after processing it is
+          estimated assuming all its reflections are queued. If that would
+          exceed the budget, completed polygons are spilled to disk, and the
+          result is a SpilledPolygonList instead of a list.
+        - If the usage would exceed the budget even after spilling, the
+          tessellation stops early, before max_polygon_count polygons.
+
+        A summary, including the peak estimated usage and whether the
+        tessellation was truncated, is stored in self.memory_report, and a
+        truncation is also logged as a warning.
         """
         queue = deque()
-        queue.append(self.center_polygon)
-        tessellated_polygons = []
-        processed = PolygonSet()
+        queue.append((self.center_polygon, 0))
+        self.polygon_depths = array('i')
+        stats = instrumentation.active()
+
+        if memory_budget is None:
+            tessellated_polygons = []
+            processed = PolygonSet()
+        else:
+            tessellated_polygons = SpilledPolygonList()
+            processed = DepthBandPolygonSet()
+            estimate = MemoryEstimate(len(self.center_polygon))
+            peak_bytes = 0
+            truncated = False
 
         while queue:
-            polygon = queue.popleft()
+            if stats is not None:
+                stats.record_queue_length(len(queue))
+            polygon, depth = queue.popleft()
+
+            if memory_budget is not None:
+                # A polygon queued with depth label k lies in layer k - 2,
+                # k - 1 or k, so only those layers can hold a duplicate.
+                processed.prune(depth - 2)
+                # The usage once this polygon's reflections are queued and it
+                # is added to the output.
+                usage, fixed_usage = estimate.in_memory_bytes(
+                    len(queue) + len(polygon),
+                    len(processed) + 1,
+                    len(tessellated_polygons.in_memory) + 1)
+                if usage > memory_budget:
+                    tessellated_polygons.spill()
+                    usage = fixed_usage + estimate.polygon_bytes
+                if usage > memory_budget:
+                    truncated = True
+                    break
+
             if processed.contains_polygon(polygon):
                 continue
 
+            if (min_polygon_area is not None
+                    and bounding_box_area(polygon) < min_polygon_area):
+                continue
+
             edges = [(polygon[i], polygon[(i + 1) % len(polygon)])
                      for i in range(len(polygon))]
             for u, v in edges:
                 line = self.disk_model.line_through(u, v)
                 reflected_polygon = [line.reflect(p) for p in polygon]
-                queue.append(reflected_polygon)
+                # With a budget, the queue is the largest structure, so don't
+                # queue polygons that are already known to be duplicates. The
+                # lookup goes through the key so that it isn't counted as a
+                # dequeue hit or miss when instrumented.
+                if (memory_budget is not None
+                        and processed.polygon_key(reflected_polygon) in processed):
+                    continue
+                queue.append((reflected_polygon, depth + 1))
 
             tessellated_polygons.append(polygon)
-            processed.add_polygon(polygon)
-            if len(processed) > max_polygon_count:
+            self.polygon_depths.append(depth)
+            if memory_budget is None:
                 processed.add_polygon(polygon)
+            else:
+                processed.add_polygon(polygon, depth)
+                usage, _ = estimate.in_memory_bytes(
+                    len(queue), len(processed), len(tessellated_polygons.in_memory))
+                peak_bytes = max(peak_bytes, usage)
+            # processed may have been pruned, so count the output instead.
+            if len(tessellated_polygons) > max_polygon_count:
                 break
 
+        if memory_budget is None:
+            self.memory_report = None
+        else:
+            if truncated:
+                logger.warning(
+                    "Tessellation stopped at %d of %d polygons to stay within a memory "
+                    "budget of %d bytes.",
+                    len(tessellated_polygons), max_polygon_count, memory_budget)
+            self.memory_report = {
+                'memory_budget': memory_budget,
+                'peak_estimated_bytes': peak_bytes,
+                'polygon_count': len(tessellated_polygons),
+                'spilled_polygons': tessellated_polygons.spilled_count,
+                'spill_files': len(tessellated_polygons.chunk_paths),
+                'truncated': truncated,
+                'max_rss_kb': _max_rss_kb(),
+            }
+
         return tessellated_polygons
 
+    def polygon_bounding_boxes(self):
+        """Return the (min_x, min_y, max_x, max_y) bounding box of each
+        tessellated polygon, including its curved sides.
+        """
+        return [
+            polygon_bounding_box(polygon, self.disk_model)
+            for polygon in self.tessellated_polygons
+        ]
+
+    def build_spatial_index(self, node_size=16):
+        """Build, store as self.spatial_index, and return a PackedRTree over
+        the bounding boxes of the tessellated polygons. Its queries return
+        indices into self.tessellated_polygons.
+        """
+        self.spatial_index = PackedRTree(self.polygon_bounding_boxes(), node_size=node_size)
+        return self.spatial_index
+
     def render(self, filename, canvas_width):
         """Output an svg file drawing the tessellation."""
+        self.render_drawing(canvas_width, filename=filename)
+        self.dwg.save()
+
+    def render_drawing(self, canvas_width, filename=None, polygons=None, view_box=None):
+        """Build and return the svgwrite.Drawing of the tessellation without
+        writing it anywhere. Use Drawing.write to output it to a file object.
+
+        polygons defaults to the tessellated polygons. If view_box is given as
+        (min_x, min_y, width, height) in canvas coordinates, the drawing shows
+        only that part of the canvas.
+        """
         self.transformer = RenderedCoords(canvas_width)
         self.dwg = svgwrite.Drawing(filename=filename, debug=False)
+        if view_box is not None:
+            self.dwg.viewbox(*view_box)
+        if polygons is None:
+            polygons = self.tessellated_polygons
 
         self.dwg.fill(color='white', opacity=0)
         boundary_circle = self.dwg.circle(
@@ -149,10 +415,114 @@ class HyperbolicTessellation(object):
         boundary_circle.fill(color='white', opacity=0)
         self.dwg.add(boundary_circle)
 
-        polygon_group = self.dwg.add(self.dwg.g(id='polygons', stroke='blue', stroke_width=1))
-        for polygon in self.tessellated_polygons:
-            self.render_polygon(polygon, polygon_group)
+        self.polygon_group = self.dwg.add(self.dwg.g(id='polygons', stroke='blue', stroke_width=1))
+        for polygon in polygons:
+            self.render_polygon(polygon, self.polygon_group)
 
+        return self.dwg
+
+    def render_parallel(self, filename, canvas_width, processes=None, shard_size=None):
+        """Output the same svg file as render, rendering the polygons in
+        worker processes.
+
+        The polygons are split into contiguous shards of shard_size polygons.
+        Each worker renders a shard to SVG markup, and the main process writes
+        the shards in order into the polygon group of an otherwise empty
+        drawing, so only one shard's markup is in memory at a time.
+        """
+        num_polygons = len(self.tessellated_polygons)
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if shard_size is None:
+            # A few shards per process balances the load without paying for
+            # many small tasks.
+            shard_size = max(1, -(-num_polygons // (4 * processes)))
+        shards = [(start, min(start + shard_size, num_polygons), canvas_width)
+                  for start in range(0, num_polygons, shard_size)]
+
+        self.render_drawing(canvas_width, filename=filename, polygons=[])
+        document = io.StringIO()
+        self.dwg.write(document)
+        empty_group = self.polygon_group.tostring()
+        prefix, marker, suffix = document.getvalue().partition(empty_group)
+        if not marker:
+            raise ValueError("Could not find the polygon group in the rendered drawing")
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(prefix)
+            f.write(empty_group[:-len(' />')] + '>')
+            with Pool(processes=processes,
+                      initializer=_initialize_shard_worker,
+                      initargs=(self,)) as pool:
+                for fragment in pool.imap(_render_shard, shards):
+                    f.write(fragment)
+            f.write('</g>')
+            f.write(suffix)
+
+    def render_shard(self, start, stop, canvas_width):
+        """Return the SVG markup that render_drawing adds to the polygon group
+        for the polygons with indices start, ..., stop - 1.
+        """
+        self.transformer = RenderedCoords(canvas_width)
+        self.dwg = svgwrite.Drawing(debug=False)
+        group = self.dwg.g()
+        for polygon in self.tessellated_polygons[start:stop]:
+            self.render_polygon(polygon, group)
+        return ''.join(element.tostring() for element in group.elements)
+
+    def geodesics(self):
+        """Return the distinct hyperbolic lines containing the edges of the
+        tessellated polygons, as (line, endpoint, endpoint) triples, where
+        the endpoints are the line's ideal points on the disk boundary.
+
+        This is only meaningful when q is even: then the edges meeting at a
+        vertex pair up into straight continuations of each other, and every
+        line through an edge is covered by edges. Raise a ValueError if q is
+        odd.
+        """
+        if self.configuration.numPolygonsPerVertex % 2 != 0:
+            raise ValueError(
+                "Edges only line up into geodesics for even q, not q={}".format(
+                    self.configuration.numPolygonsPerVertex))
+
+        mesh = IndexedMesh.from_polygons(self.tessellated_polygons)
+        # A line is identified by its pair of ideal points, which are merged
+        # with a looser tolerance than polygon vertices, because fitting a
+        # line to a short edge near the boundary amplifies rounding errors.
+        ideal_points = VertexTable(tolerance=1e-6)
+        lines = {}
+        for u, v in mesh.iter_edge_points():
+            line = self.disk_model.line_through(u, v)
+            if isinstance(line, PoincareDiskLine):
+                endpoints = line.intersect_with_circle(self.disk_model)
+            else:
+                endpoints = self.disk_model.intersect_with_line(line)
+            if len(endpoints) != 2:
+                continue
+            endpoint1, endpoint2 = sorted(endpoints)
+
+            key = tuple(sorted(ideal_points.index_of(x, y) for (x, y) in (endpoint1, endpoint2)))
+            if key not in lines:
+                lines[key] = (line, endpoint1, endpoint2)
+
+        return list(lines.values())
+
+    def render_geodesics(self, filename, canvas_width):
+        """Output an svg file drawing the tessellation as complete geodesics,
+        one arc from boundary to boundary per line, instead of one arc per
+        polygon side. Requires q to be even; see geodesics.
+        """
+        geodesics = self.geodesics()
+        self.render_drawing(canvas_width, filename=filename, polygons=[])
+        for line, endpoint1, endpoint2 in geodesics:
+            if isinstance(line, PoincareDiskLine):
+                # The part of a circle orthogonal to the boundary that lies
+                # inside the disk is its minor arc between the ideal points.
+                self.render_arc(self.polygon_group, line, endpoint1, endpoint2)
+            else:
+                self.polygon_group.add(self.dwg.line(
+                    self.transformer.in_rendered_coords(endpoint1),
+                    self.transformer.in_rendered_coords(endpoint2)))
         self.dwg.save()
 
     def render_polygon(self, polygon, group):
@@ -192,15 +562,20 @@ class HyperbolicTessellation(object):
         group.add(path)
 
 
+# The tessellation rendered by a render_parallel worker process.
+_shard_tessellation = None
+
+
+def _initialize_shard_worker(tessellation):
+    global _shard_tessellation
+    _shard_tessellation = tessellation
+
+
+def _render_shard(shard):
+    start, stop, canvas_width = shard
+    return _shard_tessellation.render_shard(start, stop, canvas_width)
+
+
 if __name__ == "__main__":
-    for p in range(3, 8):
-        for q in range(3, 8):
-            if (p - 2) * (q - 2) > 4:
-                print(p, q)
-                try:
-                    config = TessellationConfiguration(p, q)
-                    tessellation = HyperbolicTessellation(config)
-                    tessellation.render(filename="svg/tessellation_{}_{}.svg".format(p, q), canvas_width=500)
-                except Exception:
-                    print("failed")
-                    raise
+    import catalogue
+    sys.exit(catalogue.main())
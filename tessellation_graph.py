@@ -1,4 +1,8 @@
 from collections import deque
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class TessellationGraph(object):
@@ -14,34 +18,120 @@ class TessellationGraph(object):
     the next layer.
     """
 
-    def __init__(self, tessellation_configuration, num_layers=2):
+    def __init__(self, tessellation_configuration, num_layers=2, lazy=False, window=None):
         """Construct a graph with the given configuration and num_layers
         layers.
+
+        If lazy is True, layers are only generated when they are first
+        accessed through vertex_at (and the query methods built on it) or
+        iter_layers, and num_layers may be None for an unbounded graph.
+
+        If window is given (which implies lazy), only the most recent window
+        layers are kept: older layers are discarded as new ones are generated,
+        so that streaming outward through iter_layers uses memory proportional
+        to the size of the outermost layers. A layer is complete (has all of
+        its edges) once the layer after it has been generated, so window must
+        be at least 2. The vertices of a discarded layer remain visible as the
+        neighbors of the next layer, but their own edges are dropped, and
+        self.vertices is not maintained.
         """
+        if window is not None:
+            if window < 2:
+                raise ValueError("window must be at least 2, got {}".format(window))
+            lazy = True
+        if num_layers is None and not lazy:
+            raise ValueError("An unbounded graph must be lazy.")
+
         self.configuration = tessellation_configuration
+        self.num_layers = num_layers
+        self.window = window
 
         # Create the center polygon, which is the first layer.
         center = Vertex(layer=0, index_in_layer=0)
-        self.vertices = [center]
+        self.vertices = [center] if window is None else None
         self.layers = [[center]]
 
-        self.create_layers(num_layers)
+        # Whether the last layer's cyclic edges have been added, which only
+        # happens once no further layers will be generated.
+        self.last_layer_closed = False
+
+        if not lazy:
+            self.create_layers(num_layers)
 
     def vertex_at(self, layer, index_in_layer):
+        self.ensure_complete(layer)
+        if self.layers[layer] is None:
+            raise ValueError("Layer {} has been discarded from the window.".format(layer))
         return self.layers[layer][index_in_layer]
 
+    def iter_layers(self):
+        """Iterate over the complete layers of the graph, generating them as
+        needed if the graph is lazy.
+        """
+        layer_index = 0
+        while self.num_layers is None or layer_index < self.num_layers:
+            self.ensure_complete(layer_index)
+            yield self.layers[layer_index]
+            layer_index += 1
+
+    def ensure_complete(self, layer_index):
+        """Generate layers until the given layer has all of its edges."""
+        if self.num_layers is not None and not 0 <= layer_index < self.num_layers:
+            raise IndexError("Graph has no layer {}".format(layer_index))
+
+        if self.num_layers is None or layer_index + 1 < self.num_layers:
+            while len(self.layers) <= layer_index + 1:
+                self.add_layer()
+        else:
+            while len(self.layers) < self.num_layers:
+                self.add_layer()
+            if not self.last_layer_closed:
+                self.connect_cyclic_only(self.layers[-1])
+                self.last_layer_closed = True
+
+    def neighbors(self, layer, index_in_layer):
+        """Return the neighbors of a vertex, in counterclockwise order."""
+        vertex = self.vertex_at(layer, index_in_layer)
+        return [edge.other(vertex) for edge in vertex.edges]
+
+    def degree(self, layer, index_in_layer):
+        return self.vertex_at(layer, index_in_layer).degree
+
+    def has_edge(self, vertex1, vertex2):
+        """Return True if there is an edge between the two vertices, each
+        given as a (layer, index_in_layer) pair.
+        """
+        return self.vertex_at(*vertex1).is_adjacent_to(self.vertex_at(*vertex2))
+
     def create_layers(self, num_layers):
         for layer_index in range(1, num_layers):
-            layer_size = self.compute_layer_size(layer_index)
-            new_layer = [
-                Vertex(layer=layer_index, index_in_layer=i)
-                for i in range(layer_size)
-            ]
-            self.connect_layer(self.layers[-1], new_layer)
-            self.layers.append(new_layer)
-            self.vertices.extend(new_layer)
+            self.add_layer()
 
         self.connect_cyclic_only(self.layers[-1])
+        self.last_layer_closed = True
+
+    def add_layer(self):
+        """Generate the next layer and connect it to the current last layer,
+        discarding the oldest layer if it falls out of the window.
+        """
+        layer_index = len(self.layers)
+        new_layer = [
+            Vertex(layer=layer_index, index_in_layer=i)
+            for i in range(self.compute_layer_size(layer_index))
+        ]
+        self.connect_layer(self.layers[-1], new_layer)
+        self.layers.append(new_layer)
+        if self.vertices is not None:
+            self.vertices.extend(new_layer)
+
+        if self.window is not None and layer_index >= self.window:
+            self.discard_layer(layer_index - self.window)
+
+    def discard_layer(self, layer_index):
+        for vertex in self.layers[layer_index]:
+            vertex.edges.clear()
+            vertex.adjacent_vertices.clear()
+        self.layers[layer_index] = None
 
     def connect_layer(self, this_layer, next_layer):
         """Connect the vertices in next_layer to the vertices in
@@ -148,6 +238,8 @@ class TessellationGraph(object):
             e = Edge(this_layer_vertex, previous_vertex)
             this_layer_vertex.edges.append(e)
             previous_vertex.edges.appendleft(e)
+            this_layer_vertex.adjacent_vertices.add(previous_vertex)
+            previous_vertex.adjacent_vertices.add(this_layer_vertex)
 
     def compute_layer_size(self, layer_index):
         p = self.configuration.numPolygonSides
@@ -182,6 +274,94 @@ class TessellationGraph(object):
                 for vertex in self.layers[layer_index - 1])
 
 
+def layer_type_counts(tessellation_configuration, layer_index):
+    """Return the pair (num_edge_type, num_vertex_type) of vertices in the
+    given layer of a TessellationGraph, computed from the configuration alone
+    in O(log layer_index) arithmetic operations on exact integers.
+
+    Vertices of layer 1 whose previous_layer_connection_type is None are
+    counted as "vertex" type, as in TessellationGraph.compute_layer_size.
+
+    Each "edge" type vertex in layer k has p - 3 edges to layer k + 1, and each
+    "vertex" type has p - 2 (see compute_layer_size for the sizes). So the
+    counts (E_k, V_k) satisfy the linear recurrence
+
+        E_{k+1} = (p - 3) E_k + (p - 2) V_k
+        V_{k+1} = ((p - 3)(q - 3) - 1) E_k + ((p - 2)(q - 3) - 1) V_k
+
+    starting from E_1 = p, V_1 = p(q - 3), which we evaluate by raising the
+    transfer matrix to the (k - 1)-th power by repeated squaring.
+    """
+    if layer_index == 0:
+        return (0, 0)
+
+    num_edge_type, num_vertex_type, _ = _layer_recurrence(
+        tessellation_configuration, layer_index - 1)
+    return (num_edge_type, num_vertex_type)
+
+
+def layer_size(tessellation_configuration, layer_index):
+    """Return the number of vertices in the given layer of a
+    TessellationGraph, without constructing it.
+    """
+    if layer_index == 0:
+        return 1
+    return sum(layer_type_counts(tessellation_configuration, layer_index))
+
+
+def cumulative_layer_size(tessellation_configuration, num_layers):
+    """Return the total number of vertices in a TessellationGraph with
+    num_layers layers, without constructing it.
+    """
+    if num_layers <= 1:
+        return max(num_layers, 0)
+
+    # The recurrence carries a running total of the layers before the current one.
+    num_edge_type, num_vertex_type, total = _layer_recurrence(
+        tessellation_configuration, num_layers - 2)
+    return total + num_edge_type + num_vertex_type
+
+
+def _layer_recurrence(tessellation_configuration, num_steps):
+    """Apply num_steps steps of the layer recurrence to layer 1, returning
+    (E, V, T) for layer num_steps + 1, where T is the total size of all
+    previous layers.
+    """
+    p = tessellation_configuration.numPolygonSides
+    q = tessellation_configuration.numPolygonsPerVertex
+    if q < 4:
+        raise ValueError(
+            "TessellationGraph does not support configurations with q < 4.")
+
+    transfer = [
+        [p - 3, p - 2, 0],
+        [(p - 3) * (q - 3) - 1, (p - 2) * (q - 3) - 1, 0],
+        [1, 1, 1],
+    ]
+    initial = [p, p * (q - 3), 1]
+    power = _matrix_power(transfer, num_steps)
+    return tuple(
+        sum(entry * value for entry, value in zip(row, initial))
+        for row in power)
+
+
+def _matrix_multiply(A, B):
+    return [
+        [sum(A[i][k] * B[k][j] for k in range(len(B))) for j in range(len(B[0]))]
+        for i in range(len(A))
+    ]
+
+
+def _matrix_power(A, exponent):
+    result = [[int(i == j) for j in range(len(A))] for i in range(len(A))]
+    while exponent > 0:
+        if exponent & 1:
+            result = _matrix_multiply(result, A)
+        A = _matrix_multiply(A, A)
+        exponent >>= 1
+    return result
+
+
 class Vertex(object):
     """A vertex is uniquely identified by the pair of its layer index and its position within a layer.
 
@@ -199,16 +379,24 @@ class Vertex(object):
         self.index_in_layer = index_in_layer
         self.previous_layer_connection_type = None
         self.edges = deque()
+        # The vertices of the corresponding polygon, if they have been
+        # computed (see graph_geometry).
+        self.polygon = None
+        # An index of the vertices at the other end of self.edges, for
+        # constant time adjacency checks.
+        self.adjacent_vertices = set()
 
     @property
     def degree(self):
         return len(self.edges)
 
     def add_edge(self, vertex):
-        print("Adding edge between %s and %s" % (self, vertex))
+        logger.debug("Adding edge between %s and %s", self, vertex)
         e = Edge(self, vertex)
         self.edges.append(e)
         vertex.edges.append(e)
+        self.adjacent_vertices.add(vertex)
+        vertex.adjacent_vertices.add(self)
 
     def __str__(self):
         return "v_{},{}".format(self.layer, self.index_in_layer)
@@ -218,7 +406,7 @@ class Vertex(object):
         return str(self)
 
     def is_adjacent_to(self, vertex):
-        return sum(1 for e in self.edges if e.contains(vertex)) > 0
+        return vertex in self.adjacent_vertices
 
 
 class Edge(object):
@@ -231,16 +419,13 @@ class Edge(object):
     def contains(self, vertex):
         return vertex in self.incident_vertices
 
-
-'''
     def other(self, vertex):
         """Return the vertex incident to this edge which is not the given vertex."""
-        if self.incident_vertices[0] == vertex:
+        if self.incident_vertices[0] is vertex:
             return self.incident_vertices[1]
 
-        if self.incident_vertices[1] == vertex:
-            raise Exception("Supplied a vertex not a member of this edge. "
-                    "edge={}, vertex={}".format(self, vertex))
+        if self.incident_vertices[1] is not vertex:
+            raise ValueError("Supplied a vertex not a member of this edge. "
+                             "edge={}, vertex={}".format(self, vertex))
 
         return self.incident_vertices[0]
-'''
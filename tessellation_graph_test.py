@@ -1,4 +1,5 @@
 import itertools
+import pytest
 
 from tessellation import TessellationConfiguration
 from tessellation_graph import *
@@ -172,3 +173,91 @@ def test_four_layer_tessellation_graph_3_7():
         print()
 
     assert_edges_are_exactly(graph, edges)
+
+
+def test_query_api():
+    graph = TessellationGraph(TessellationConfiguration(6, 4), num_layers=3)
+    assert graph.degree(0, 0) == 6
+    assert [(v.layer, v.index_in_layer) for v in graph.neighbors(0, 0)] == [
+        (1, 0), (1, 2), (1, 4), (1, 6), (1, 8), (1, 10)]
+    assert [(v.layer, v.index_in_layer) for v in graph.neighbors(1, 1)] == [
+        (1, 2), (1, 0), (2, 5), (2, 7), (2, 9), (2, 11)]
+    assert graph.has_edge((1, 1), (2, 5))
+    assert graph.has_edge((2, 5), (1, 1))
+    assert not graph.has_edge((1, 1), (2, 4))
+
+
+def test_construction_does_not_print(capsys):
+    TessellationGraph(TessellationConfiguration(6, 4), num_layers=3)
+    assert capsys.readouterr().out == ""
+
+
+def test_closed_form_layer_sizes_match_constructed_graph():
+    for p, q in [(6, 4), (3, 7), (4, 5), (5, 5), (4, 6)]:
+        config = TessellationConfiguration(p, q)
+        graph = TessellationGraph(config, num_layers=5)
+        for layer_index, layer in enumerate(graph.layers):
+            assert layer_size(config, layer_index) == len(layer)
+            num_edge_type = sum(1 for v in layer if v.previous_layer_connection_type == "edge")
+            if layer_index > 0:
+                assert layer_type_counts(config, layer_index) == (
+                    num_edge_type, len(layer) - num_edge_type)
+        for num_layers in range(1, 6):
+            assert cumulative_layer_size(config, num_layers) == sum(
+                len(layer) for layer in graph.layers[:num_layers])
+
+
+def test_closed_form_layer_sizes_deep():
+    config = TessellationConfiguration(6, 4)
+    assert [layer_size(config, k) for k in range(5)] == [1, 12, 72, 420, 2448]
+    assert layer_size(config, 100) > 10 ** 70
+    assert cumulative_layer_size(config, 101) == sum(layer_size(config, k) for k in range(101))
+
+
+def edge_set(graph, layers):
+    return {
+        ((v.layer, v.index_in_layer), (w.layer, w.index_in_layer))
+        for layer in layers
+        for v in layer
+        for w in graph.neighbors(v.layer, v.index_in_layer)
+    }
+
+
+def test_lazy_graph_generates_layers_on_access():
+    config = TessellationConfiguration(6, 4)
+    eager = TessellationGraph(config, num_layers=4)
+    lazy = TessellationGraph(config, num_layers=4, lazy=True)
+    assert len(lazy.layers) == 1
+
+    assert lazy.degree(1, 3) == eager.degree(1, 3)
+    assert len(lazy.layers) == 3
+
+    assert edge_set(lazy, list(lazy.iter_layers())) == edge_set(eager, eager.layers)
+    assert len(lazy.vertices) == len(eager.vertices)
+
+
+def test_windowed_graph_keeps_two_layers():
+    config = TessellationConfiguration(4, 5)
+    eager = TessellationGraph(config, num_layers=6)
+    windowed = TessellationGraph(config, num_layers=6, window=2)
+
+    for layer_index, layer in enumerate(windowed.iter_layers()):
+        assert sum(1 for layer in windowed.layers if layer is not None) <= 2
+        assert len(layer) == len(eager.layers[layer_index])
+        assert edge_set(windowed, [layer]) == edge_set(eager, [eager.layers[layer_index]])
+
+    with pytest.raises(ValueError):
+        windowed.vertex_at(1, 0)
+
+
+def test_unbounded_lazy_graph():
+    graph = TessellationGraph(TessellationConfiguration(3, 7), num_layers=None, window=2)
+    sizes = []
+    for layer in graph.iter_layers():
+        sizes.append(len(layer))
+        if len(sizes) == 6:
+            break
+    assert sizes == [layer_size(graph.configuration, k) for k in range(6)]
+
+    with pytest.raises(ValueError):
+        TessellationGraph(TessellationConfiguration(3, 7), num_layers=None)
@@ -1,8 +1,11 @@
 from assertpy import assert_that
 from geometry import Point
 from geometry import rotate_around_origin
+from hyperbolic_metric import hyperbolic_distance
+from hyperbolic_metric import polygon_center
 import itertools
 import math
+import pytest
 
 from tessellation import *
 from testing import *
@@ -37,3 +40,152 @@ def test_center_polygon():
     ]
 
     assert_iterables_are_close(tessellation.compute_center_polygon(), vertices)
+
+
+def test_tessellate_min_polygon_area():
+    config = TessellationConfiguration(6, 4)
+    unbounded = HyperbolicTessellation(config, max_polygon_count=200)
+    bounded = HyperbolicTessellation(config, max_polygon_count=200, min_polygon_area=0.01)
+    assert len(bounded.tessellated_polygons) < len(unbounded.tessellated_polygons)
+    assert all(bounding_box_area(polygon) >= 0.01 for polygon in bounded.tessellated_polygons)
+
+
+def test_render_parallel_matches_render(tmpdir):
+    tessellation = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=40)
+    serial = str(tmpdir.join('serial.svg'))
+    parallel = str(tmpdir.join('parallel.svg'))
+
+    tessellation.render(serial, 500)
+    tessellation.render_parallel(parallel, 500, processes=2, shard_size=7)
+
+    with open(serial) as f1, open(parallel) as f2:
+        assert f1.read() == f2.read()
+
+
+def test_tessellate_memory_budget_matches_unbudgeted():
+    config = TessellationConfiguration(4, 5)
+    unbudgeted = HyperbolicTessellation(config, max_polygon_count=300)
+    budgeted = HyperbolicTessellation(config, max_polygon_count=300, memory_budget=10 ** 8)
+
+    assert unbudgeted.memory_report is None
+    assert list(budgeted.tessellated_polygons) == unbudgeted.tessellated_polygons
+    assert budgeted.polygon_depths == unbudgeted.polygon_depths
+    assert budgeted.polygon_depths[0] == 0
+    assert list(budgeted.polygon_depths) == sorted(budgeted.polygon_depths)
+    assert budgeted.memory_report['truncated'] is False
+    assert budgeted.memory_report['spilled_polygons'] == 0
+
+
+def test_tessellate_memory_budget_spills_and_truncates(caplog):
+    config = TessellationConfiguration(4, 5)
+    unbudgeted = HyperbolicTessellation(config, max_polygon_count=2000)
+    budgeted = HyperbolicTessellation(config, max_polygon_count=2000, memory_budget=400000)
+    report = budgeted.memory_report
+    assert "stopped at {} of 2000 polygons".format(report['polygon_count']) in caplog.text
+
+    assert report['truncated'] is True
+    assert report['spill_files'] > 1
+    assert report['spilled_polygons'] > 0
+    assert report['polygon_count'] == len(budgeted.tessellated_polygons)
+    assert 0 < report['peak_estimated_bytes'] <= 400000
+
+    polygons = budgeted.tessellated_polygons
+    assert list(polygons) == unbudgeted.tessellated_polygons[:len(polygons)]
+    assert polygons[len(polygons) // 2] == unbudgeted.tessellated_polygons[len(polygons) // 2]
+
+
+@pytest.mark.parametrize("memory_budget", [300000, 1000000])
+def test_tessellate_memory_budget_is_a_cap(memory_budget):
+    tessellation = HyperbolicTessellation(
+        TessellationConfiguration(4, 5), max_polygon_count=2000, memory_budget=memory_budget)
+    assert tessellation.memory_report['peak_estimated_bytes'] <= memory_budget
+
+
+def test_depth_band_polygon_set_prune():
+    polygons = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=10)
+    processed = DepthBandPolygonSet()
+    for polygon, depth in zip(polygons.tessellated_polygons, polygons.polygon_depths):
+        processed.add_polygon(polygon, depth)
+    assert processed.contains_polygon(polygons.center_polygon)
+
+    processed.prune(1)
+    assert not processed.contains_polygon(polygons.center_polygon)
+    assert len(processed) == len(polygons.tessellated_polygons) - 1
+
+
+def test_geodesics_requires_even_q():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=10)
+    with pytest.raises(ValueError):
+        tessellation.geodesics()
+
+
+def test_geodesics_cover_edges():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(4, 6), max_polygon_count=100)
+    geodesics = tessellation.geodesics()
+    polygons = tessellation.tessellated_polygons
+
+    assert len(geodesics) < sum(len(polygon) for polygon in polygons) / 2
+    for line, endpoint1, endpoint2 in geodesics:
+        assert_are_close(endpoint1.norm(), 1)
+        assert_are_close(endpoint2.norm(), 1)
+
+    def on_geodesic(point, geodesic):
+        line, endpoint1, endpoint2 = geodesic
+        if isinstance(line, PoincareDiskLine):
+            return abs((point - line.center).norm() - line.radius) < 1e-6
+        return orientation(endpoint1, endpoint2, point) == 'collinear'
+
+    for polygon in polygons:
+        for u, v in zip(polygon, polygon[1:] + polygon[:1]):
+            assert any(on_geodesic(u, g) and on_geodesic(v, g) for g in geodesics)
+
+
+def test_render_geodesics(tmpdir):
+    tessellation = HyperbolicTessellation(TessellationConfiguration(6, 4), max_polygon_count=50)
+    filename = str(tmpdir.join('geodesics.svg'))
+    tessellation.render_geodesics(filename, 500)
+
+    with open(filename) as f:
+        svg = f.read()
+    geodesics = tessellation.geodesics()
+    arcs = [line for line, _, _ in geodesics if isinstance(line, PoincareDiskLine)]
+    assert svg.count('<path') == len(arcs)
+    assert svg.count('<line') == len(geodesics) - len(arcs)
+
+
+def test_dual():
+    tessellation = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=300)
+    dual = tessellation.dual()
+    assert dual.configuration == TessellationConfiguration(5, 4)
+    assert dual.center_polygon == dual.tessellated_polygons[0]
+    # Like any tessellation, the dual's center polygon is the standard one,
+    # centered at the origin.
+    assert_iterables_are_close(dual.center_polygon, dual.compute_center_polygon())
+    assert_are_close(polygon_center(dual.center_polygon), Point(0, 0))
+
+    # The dual polygons are tiles of the standard {5, 4} tessellation.
+    tiles = PolygonSet()
+    for polygon in HyperbolicTessellation(
+            TessellationConfiguration(5, 4), max_polygon_count=2000).tessellated_polygons:
+        tiles.add_polygon(polygon)
+    assert all(tiles.contains_polygon(polygon) for polygon in dual.tessellated_polygons)
+
+    # Dual polygons are congruent to the center polygon of the {5, 4}
+    # tessellation, and counterclockwise.
+    standard = HyperbolicTessellation(TessellationConfiguration(5, 4), max_polygon_count=1)
+    side = hyperbolic_distance(standard.center_polygon[0], standard.center_polygon[1])
+    for polygon in dual.tessellated_polygons:
+        assert len(polygon) == 5
+        assert orientation(*polygon[:3]) == 'counterclockwise'
+        for u, v in zip(polygon, polygon[1:] + polygon[:1]):
+            assert_are_close(hyperbolic_distance(u, v), side)
+
+    # The dual of the dual is made of polygons of the standard {4, 5}
+    # tessellation.
+    original = PolygonSet()
+    larger = HyperbolicTessellation(TessellationConfiguration(4, 5), max_polygon_count=3000)
+    for polygon in larger.tessellated_polygons:
+        original.add_polygon(polygon)
+    double_dual = dual.dual()
+    assert len(double_dual.tessellated_polygons) > 0
+    assert all(original.contains_polygon(polygon) for polygon in double_dual.tessellated_polygons)
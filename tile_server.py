@@ -0,0 +1,385 @@
+"""A local HTTP server for SVG tiles of hyperbolic tessellations.
+
+Tiles are addressed as
+
+    GET /tiles/{p}/{q}/{zoom}/{x}/{y}.svg?cx=...&cy=...
+
+The view is the tessellation moved by the hyperbolic translation taking the
+view center (cx, cy) (default the origin) to the origin of the disk. At zoom
+level z, the square [-1, 1] x [-1, 1] containing the disk is split into
+2^z x 2^z tiles, with tile (0, 0) in the top left corner.
+
+    GET /stats
+
+returns JSON statistics about the tile cache and rendering.
+
+Tessellations are computed once, when the server starts, and handed to each
+process of a worker pool, which renders tiles so that the event loop never
+blocks on rendering. Rendered tiles are kept in an LRU cache bounded by their
+total size, and concurrent requests for the same tile share one render.
+
+Example:
+
+    python tile_server.py --configuration 4 5 --configuration 6 4 --port 8000
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from mobius import MobiusTransform
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import re
+
+
+MAX_ZOOM = 16
+TILE_PATH = re.compile(r'^/tiles/(\d+)/(\d+)/(\d+)/(\d+)/(\d+)\.svg$')
+
+
+class LRUCache(object):
+    """A mapping from keys to bytes values, holding at most max_bytes of
+    values, that evicts the least recently used entries to make room.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Return the value for key, or None, counting a hit or a miss."""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store a value, evicting old entries until it fits. Values larger
+        than the whole cache are not stored.
+        """
+        if key in self.entries:
+            self.current_bytes -= len(self.entries.pop(key))
+        if len(value) > self.max_bytes:
+            return
+
+        while self.current_bytes + len(value) > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+            self.evictions += 1
+
+        self.entries[key] = value
+        self.current_bytes += len(value)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def tile_bounds(zoom, x, y):
+    """Return the (min_x, min_y, max_x, max_y) region of the disk's plane
+    covered by a tile. Tile rows count down from the top, so y is flipped.
+    """
+    size = 2 / 2 ** zoom
+    return (-1 + x * size, 1 - (y + 1) * size, -1 + (x + 1) * size, 1 - y * size)
+
+
+def _circle_through(z1, z2, z3):
+    """Return the (center, radius) of the circle through three complex
+    numbers.
+    """
+    w = (z3 - z1) / (z2 - z1)
+    center = (z2 - z1) * (w - abs(w) ** 2) / (2j * w.imag) + z1
+    return center, abs(center - z1)
+
+
+def candidate_polygons(tessellation, view_transform, bounds):
+    """Return the indices of the polygons that may be visible in a tile,
+    using the tessellation's spatial index.
+
+    The visible polygons P are those with view_transform(P) meeting the tile,
+    or equivalently those meeting the preimage of the tile. We bound the tile
+    by its circumscribed disk, whose preimage under a Mobius transform is
+    again a disk, unless it contains the point mapped to infinity.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    index = tessellation.spatial_index
+    if view_transform is None:
+        return index.query_rectangle(min_x, min_y, max_x, max_y)
+
+    center = complex((min_x + max_x) / 2, (min_y + max_y) / 2)
+    radius = abs(complex(max_x, max_y) - center)
+    inverse = view_transform.inverse()
+    if inverse.c != 0 and abs(-inverse.d / inverse.c - center) <= radius:
+        return range(len(tessellation.tessellated_polygons))
+
+    images = []
+    for unit in (1, complex(-0.5, 0.75 ** 0.5), complex(-0.5, -(0.75 ** 0.5))):
+        z = center + radius * unit
+        image = inverse((z.real, z.imag))
+        images.append(complex(image.x, image.y))
+    preimage_center, preimage_radius = _circle_through(*images)
+    return index.query_disk((preimage_center.real, preimage_center.imag), preimage_radius)
+
+
+def render_tile(tessellation, zoom, x, y, view_center=(0, 0), tile_size=256):
+    """Return the SVG text of a tile of the tessellation."""
+    if view_center[0] == 0 and view_center[1] == 0:
+        view_transform = None
+    else:
+        view_transform = MobiusTransform.translation(view_center).inverse()
+
+    polygons = tessellation.tessellated_polygons
+    visible = [polygons[i] for i in candidate_polygons(
+        tessellation, view_transform, tile_bounds(zoom, x, y))]
+    if view_transform is not None:
+        visible = view_transform.apply_to_polygons(visible)
+
+    dwg = tessellation.render_drawing(
+        tile_size * 2 ** zoom,
+        polygons=visible,
+        view_box=(x * tile_size, y * tile_size, tile_size, tile_size))
+    dwg['width'] = tile_size
+    dwg['height'] = tile_size
+
+    output = io.StringIO()
+    dwg.write(output)
+    return output.getvalue()
+
+
+# The tessellations of a worker process, keyed by (p, q), set by
+# _initialize_worker.
+_worker_tessellations = None
+
+
+def _initialize_worker(tessellations):
+    global _worker_tessellations
+    _worker_tessellations = tessellations
+
+
+def _render_in_worker(key, tile_size):
+    p, q, zoom, x, y, cx, cy = key
+    svg = render_tile(_worker_tessellations[(p, q)], zoom, x, y, (cx, cy), tile_size)
+    return svg.encode('utf-8')
+
+
+def build_tessellations(configurations, max_polygon_count=500):
+    """Compute and index a tessellation for each (p, q) pair."""
+    tessellations = {}
+    for p, q in configurations:
+        tessellation = HyperbolicTessellation(
+            TessellationConfiguration(p, q), max_polygon_count=max_polygon_count)
+        tessellation.build_spatial_index()
+        tessellations[(p, q)] = tessellation
+    return tessellations
+
+
+class TileServer(object):
+    def __init__(self, tessellations, tile_size=256, cache_bytes=64 * 2 ** 20, max_workers=None):
+        """Serve tiles of the given tessellations, a dict mapping (p, q) to a
+        HyperbolicTessellation with a spatial index (see build_tessellations).
+        """
+        self.tessellations = tessellations
+        self.tile_size = tile_size
+        self.max_workers = max_workers
+        self.cache = LRUCache(cache_bytes)
+        self.in_flight = {}
+        self.requests = 0
+        self.renders = 0
+        self.shared_renders = 0
+        self.executor = None
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8000):
+        """Start the worker pool and listen for connections. Returns the
+        asyncio server; use port 0 to pick a free port.
+        """
+        # Forking a process that is running an event loop can deadlock the
+        # pool's queues, so workers are spawned and receive a pickled copy of
+        # the tessellations.
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initialize_worker,
+            initargs=(self.tessellations,))
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats.update(
+            requests=self.requests,
+            renders=self.renders,
+            shared_renders=self.shared_renders,
+            in_flight=len(self.in_flight),
+        )
+        return stats
+
+    async def tile(self, key):
+        """Return the SVG bytes of a tile, from the cache if possible. A tile
+        that is already being rendered is awaited rather than rendered again.
+        """
+        svg = self.cache.get(key)
+        if svg is not None:
+            return svg
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.shared_renders += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, _render_in_worker, key, self.tile_size)
+        self.in_flight[key] = future
+        self.renders += 1
+        try:
+            svg = await asyncio.shield(future)
+        finally:
+            del self.in_flight[key]
+        self.cache.put(key, svg)
+        return svg
+
+    def parse_tile_key(self, path, query):
+        """Return the cache key (p, q, zoom, x, y, cx, cy) of a tile path.
+        Raises LookupError for paths that name no tile, and ValueError for
+        invalid tile coordinates.
+        """
+        match = TILE_PATH.match(path)
+        if match is None:
+            raise LookupError(path)
+        p, q, zoom, x, y = (int(group) for group in match.groups())
+        if (p, q) not in self.tessellations:
+            raise LookupError("No tessellation for {{{}, {}}}".format(p, q))
+        if zoom > MAX_ZOOM:
+            raise ValueError("Zoom {} is larger than {}".format(zoom, MAX_ZOOM))
+        if x >= 2 ** zoom or y >= 2 ** zoom:
+            raise ValueError("Tile ({}, {}) is outside zoom level {}".format(x, y, zoom))
+
+        params = parse_qs(query)
+        cx = float(params.get('cx', ['0'])[0])
+        cy = float(params.get('cy', ['0'])[0])
+        if cx * cx + cy * cy >= 1:
+            raise ValueError("View center ({}, {}) is not in the disk".format(cx, cy))
+        # Round so that nearly identical view centers share cache entries.
+        return (p, q, zoom, x, y, round(cx, 9), round(cy, 9))
+
+    async def respond(self, method, target):
+        """Return the (status, content type, body) of a request."""
+        if method != 'GET':
+            return 405, 'text/plain', b'Method not allowed\n'
+
+        url = urlsplit(target)
+        if url.path == '/stats':
+            return 200, 'application/json', json.dumps(self.stats()).encode('utf-8')
+
+        try:
+            key = self.parse_tile_key(url.path, url.query)
+        except LookupError:
+            return 404, 'text/plain', b'Not found\n'
+        except ValueError as e:
+            return 400, 'text/plain', '{}\n'.format(e).encode('utf-8')
+
+        try:
+            svg = await self.tile(key)
+        except Exception as e:
+            return 500, 'text/plain', '{!r}\n'.format(e).encode('utf-8')
+        return 200, 'image/svg+xml', svg
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            # Skip the headers; no request needs them.
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            self.requests += 1
+            if len(request_line) != 3:
+                status, content_type, body = 400, 'text/plain', b'Bad request\n'
+            else:
+                status, content_type, body = await self.respond(request_line[0], request_line[1])
+
+            writer.write((
+                'HTTP/1.1 {} {}\r\n'
+                'Content-Type: {}\r\n'
+                'Content-Length: {}\r\n'
+                'Connection: close\r\n'
+                '\r\n').format(status, _REASONS[status], content_type, len(body)).encode('latin-1'))
+            writer.write(body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Serve SVG tiles of hyperbolic tessellations.")
+    parser.add_argument('--configuration', nargs=2, type=int, action='append', metavar=('P', 'Q'),
+                        help="a {p, q} tessellation to serve (may be repeated; default 4 5)")
+    parser.add_argument('--max-polygon-count', type=int, default=500)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--tile-size', type=int, default=256)
+    parser.add_argument('--cache-megabytes', type=float, default=64)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of rendering processes (default: one per core)")
+    return parser
+
+
+async def serve(args):
+    tessellations = build_tessellations(
+        [tuple(c) for c in args.configuration or [(4, 5)]],
+        max_polygon_count=args.max_polygon_count)
+    server = TileServer(
+        tessellations,
+        tile_size=args.tile_size,
+        cache_bytes=int(args.cache_megabytes * 2 ** 20),
+        max_workers=args.workers)
+    await server.start(args.host, args.port)
+    print("Serving tiles on http://{}:{}/tiles/".format(args.host, args.port))
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    asyncio.run(serve(build_parser().parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
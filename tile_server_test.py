@@ -0,0 +1,112 @@
+import asyncio
+import json
+import pytest
+
+from mobius import MobiusTransform
+from tile_server import *
+
+
+@pytest.fixture(scope='module')
+def tessellations():
+    return build_tessellations([(4, 5)], max_polygon_count=60)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    assert cache.get('a') == b'1234'
+    cache.put('c', b'1234')
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.stats() == {
+        'entries': 2,
+        'bytes': 8,
+        'max_bytes': 10,
+        'hits': 1,
+        'misses': 1,
+        'evictions': 1,
+        'hit_rate': 0.5,
+    }
+
+    cache.put('huge', b'x' * 11)
+    assert 'huge' not in cache
+    assert len(cache) == 2
+
+
+def test_tile_bounds():
+    assert tile_bounds(0, 0, 0) == (-1, -1, 1, 1)
+    assert tile_bounds(1, 0, 0) == (-1, 0, 0, 1)
+    assert tile_bounds(1, 1, 1) == (0, -1, 1, 0)
+
+
+@pytest.mark.parametrize('view_center', [(0, 0), (0.3, -0.2), (-0.6, 0.5)])
+def test_candidate_polygons_include_all_visible(tessellations, view_center):
+    tessellation = tessellations[(4, 5)]
+    view_transform = MobiusTransform.translation(view_center).inverse()
+    if view_center == (0, 0):
+        view_transform = None
+
+    for tile_x in range(4):
+        for tile_y in range(4):
+            bounds = tile_bounds(2, tile_x, tile_y)
+            candidates = set(candidate_polygons(tessellation, view_transform, bounds))
+            for i, polygon in enumerate(tessellation.tessellated_polygons):
+                if view_transform is not None:
+                    polygon = view_transform.apply_to_points(polygon)
+                min_x, min_y, max_x, max_y = bounds
+                if any(min_x <= x <= max_x and min_y <= y <= max_y for (x, y) in polygon):
+                    assert i in candidates
+
+
+def test_render_tile(tessellations):
+    svg = render_tile(tessellations[(4, 5)], 1, 1, 0, view_center=(0.2, 0.1), tile_size=128)
+    assert svg.startswith('<?xml')
+    assert 'viewBox="128,0,128,128"' in svg
+    assert 'width="128"' in svg
+    assert '<path' in svg
+
+
+def fetch(port, target):
+    async def request():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write('GET {} HTTP/1.1\r\nHost: localhost\r\n\r\n'.format(target).encode('latin-1'))
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), body
+    return request()
+
+
+def test_server(tessellations):
+    async def scenario():
+        server = TileServer(tessellations, tile_size=64, max_workers=2)
+        await server.start(port=0)
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            responses = await asyncio.gather(*(
+                fetch(port, '/tiles/4/5/1/0/0.svg?cx=0.1&cy=0') for _ in range(4)))
+            assert all(status == 200 for status, _ in responses)
+            assert len(set(body for _, body in responses)) == 1
+
+            # Requested while cached.
+            status, _ = await fetch(port, '/tiles/4/5/1/0/0.svg?cx=0.1&cy=0')
+            assert status == 200
+
+            assert (await fetch(port, '/tiles/3/3/0/0/0.svg'))[0] == 404
+            assert (await fetch(port, '/tiles/4/5/1/2/0.svg'))[0] == 400
+            assert (await fetch(port, '/tiles/4/5/0/0/0.svg?cx=1'))[0] == 400
+
+            status, body = await fetch(port, '/stats')
+            return status, json.loads(body.decode('utf-8'))
+        finally:
+            await server.close()
+
+    status, stats = asyncio.run(scenario())
+    assert status == 200
+    assert stats['renders'] == 1
+    assert stats['shared_renders'] + stats['hits'] == 4
+    assert stats['entries'] == 1
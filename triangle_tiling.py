@@ -0,0 +1,113 @@
+"""The tiling of the Poincare disk by copies of the fundamental triangle.
+
+Each polygon of a {p, q} tessellation splits into 2p triangles, each with a
+vertex at the polygon's center, one at a polygon vertex, and one at the
+midpoint of a polygon side: the barycentric subdivision of the tessellation.
+All of them are images of the fundamental triangle under the reflection group
+it generates, and the parity of a triangle is the parity of the number of
+reflections that produce it. Triangles sharing a side have opposite parities,
+so the parities give the tiling's checkerboard coloring.
+
+Rather than reflecting triangles one at a time, each polygon's triangles are
+the image of the center polygon's triangles under the isometry taking the
+center polygon to it, which is found from the polygon's center, first vertex
+and orientation.
+"""
+
+from array import array
+from geometry import Point
+from geometry import orientation
+from hyperbolic import compute_fundamental_triangle
+from hyperbolic_metric import polygon_center
+from mobius import MobiusTransform
+import math
+
+
+def center_polygon_midpoints(configuration):
+    """Return the midpoints of the sides of the center polygon, in
+    counterclockwise order starting from the x_axis_vertex of the fundamental
+    triangle. The k-th midpoint lies on the side from vertex k - 1 to vertex
+    k of the center polygon.
+    """
+    p = configuration.numPolygonSides
+    _, _, x_axis_vertex = compute_fundamental_triangle(configuration)
+    return [MobiusTransform.rotation(2 * math.pi * k / p)(x_axis_vertex) for k in range(p)]
+
+
+def isometry_from_center_polygon(polygon, p):
+    """Return the MobiusTransform taking the center polygon of a {p, q}
+    tessellation to the given polygon, vertex k to polygon[k].
+
+    The isometry is a rotation about the origin, followed by the translation
+    taking the origin to the polygon's center. If the polygon's vertices are
+    listed clockwise, the rotation is preceded by the reflection in the
+    x-axis, which maps the center polygon to itself with its vertex order
+    reversed.
+    """
+    center = polygon_center(polygon)
+    to_center = MobiusTransform.translation(center)
+    first_vertex = to_center.inverse()(polygon[0])
+    first_vertex_angle = math.atan2(first_vertex.y, first_vertex.x)
+
+    reverses_orientation = orientation(polygon[0], polygon[1], polygon[2]) == 'clockwise'
+    if reverses_orientation:
+        # Reflection in the x-axis moves vertex 0 to the angle -pi / p.
+        rotation = MobiusTransform.rotation(first_vertex_angle + math.pi / p)
+        return to_center * rotation * MobiusTransform(1, 0, 0, 1, conjugate=True)
+
+    rotation = MobiusTransform.rotation(first_vertex_angle - math.pi / p)
+    return to_center * rotation
+
+
+class TriangleTiling(object):
+    def __init__(self, configuration, triangles, parities):
+        """A list of triangles, each a (polygon center, polygon vertex, side
+        midpoint) triple of Points, and an array of their parities (0 for the
+        fundamental triangle and triangles of the same orientation, 1 for the
+        others).
+        """
+        self.configuration = configuration
+        self.triangles = triangles
+        self.parities = parities
+
+    @staticmethod
+    def from_polygons(configuration, polygons):
+        """Subdivide each polygon of a {p, q} tessellation into its 2p
+        triangles, in counterclockwise order around the center polygon's
+        image. Triangles 2p * i, ..., 2p * (i + 1) - 1 belong to polygon i.
+        """
+        p = configuration.numPolygonSides
+        midpoints = center_polygon_midpoints(configuration)
+        triangles = []
+        parities = array('b')
+
+        for polygon in polygons:
+            isometry = isometry_from_center_polygon(polygon, p)
+            center = isometry(Point(0, 0))
+            polygon_midpoints = isometry.apply_to_points(midpoints)
+            parity = 1 if isometry.reverses_orientation else 0
+
+            """In the center polygon, the triangle between vertex k and
+            midpoint k is a rotation of the fundamental triangle, and the
+            triangle between vertex k and midpoint k + 1 is its reflection.
+            """
+            for k in range(p):
+                triangles.append((center, polygon[k], polygon_midpoints[k]))
+                parities.append(parity)
+                triangles.append((center, polygon[k], polygon_midpoints[(k + 1) % p]))
+                parities.append(1 - parity)
+
+        return TriangleTiling(configuration, triangles, parities)
+
+    @staticmethod
+    def from_tessellation(tessellation):
+        return TriangleTiling.from_polygons(
+            tessellation.configuration, tessellation.tessellated_polygons)
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def triangles_of_polygon(self, polygon_index):
+        """Return the triangles subdividing one polygon."""
+        count = 2 * self.configuration.numPolygonSides
+        return self.triangles[count * polygon_index:count * (polygon_index + 1)]
@@ -0,0 +1,85 @@
+import pytest
+
+from geometry import orientation
+from hyperbolic import PoincareDiskLine
+from hyperbolic import PoincareDiskModel
+from hyperbolic import compute_fundamental_triangle
+from hyperbolic_metric import hyperbolic_distance
+from tessellation import HyperbolicTessellation
+from tessellation import TessellationConfiguration
+from testing import *
+from triangle_tiling import *
+
+
+CONFIGURATIONS = [(4, 5), (3, 7), (6, 4), (5, 4)]
+
+
+@pytest.fixture(scope='module', params=CONFIGURATIONS)
+def tiling(request):
+    tessellation = HyperbolicTessellation(
+        TessellationConfiguration(*request.param), max_polygon_count=60)
+    return tessellation, TriangleTiling.from_tessellation(tessellation)
+
+
+def test_center_polygon_triangles(tiling):
+    tessellation, tiling = tiling
+    p = tessellation.configuration.numPolygonSides
+    A, B, D = compute_fundamental_triangle(tessellation.configuration)
+
+    first = tiling.triangles_of_polygon(0)
+    assert len(first) == 2 * p
+    assert_iterables_are_close(first[0], [A, B, D])
+    assert tiling.parities[0] == 0
+    assert tiling.parities[1] == 1
+
+
+def test_triangle_count_and_parity_balance(tiling):
+    tessellation, tiling = tiling
+    p = tessellation.configuration.numPolygonSides
+    assert len(tiling) == 2 * p * len(tessellation.tessellated_polygons)
+    assert sum(tiling.parities) == len(tiling) // 2
+
+
+def test_triangles_are_congruent_to_fundamental_triangle(tiling):
+    tessellation, tiling = tiling
+    disk_model = PoincareDiskModel(Point(0, 0), radius=1)
+    A, B, D = compute_fundamental_triangle(tessellation.configuration)
+    expected = [hyperbolic_distance(A, B), hyperbolic_distance(B, D), hyperbolic_distance(A, D)]
+
+    for i, polygon in enumerate(tessellation.tessellated_polygons):
+        for center, vertex, midpoint in tiling.triangles_of_polygon(i):
+            assert_iterables_are_close(
+                [hyperbolic_distance(center, vertex),
+                 hyperbolic_distance(vertex, midpoint),
+                 hyperbolic_distance(center, midpoint)],
+                expected)
+
+        # Each midpoint lies on the side between vertices k - 1 and k.
+        for k, (_, vertex, midpoint) in enumerate(tiling.triangles_of_polygon(i)[::2]):
+            side = disk_model.line_through(polygon[k - 1], polygon[k])
+            if isinstance(side, PoincareDiskLine):
+                assert_are_close((midpoint - side.center).norm(), side.radius)
+            else:
+                assert orientation(polygon[k - 1], polygon[k], midpoint) == 'collinear'
+
+
+def test_parity_is_orientation(tiling):
+    _, tiling = tiling
+    for triangle, parity in zip(tiling.triangles, tiling.parities):
+        expected = 'clockwise' if parity == 0 else 'counterclockwise'
+        assert orientation(*triangle) == expected
+
+
+def test_adjacent_triangles_have_opposite_parity(tiling):
+    _, tiling = tiling
+
+    def key(p1, p2):
+        return frozenset((round(p.x, 6), round(p.y, 6)) for p in (p1, p2))
+
+    sides = {}
+    for (center, vertex, midpoint), parity in zip(tiling.triangles, tiling.parities):
+        sides.setdefault(key(vertex, midpoint), []).append(parity)
+
+    shared = [parities for parities in sides.values() if len(parities) == 2]
+    assert shared
+    assert all(sorted(parities) == [0, 1] for parities in shared)